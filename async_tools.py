@@ -0,0 +1,137 @@
+"""
+Solve puzzles from asyncio code without blocking the event loop.
+"""
+from puzzle_tools import PuzzleNode, SearchStats, depth_first_solve, \
+    breadth_first_solve, bounded_breadth_first_solve, bidirectional_solve, \
+    astar_solve, ida_star_solve, iterative_deepening_solve, iter_search
+from collections import deque
+from functools import partial
+import asyncio
+import threading
+
+# Strategies that take the stats, callback and every arguments, through
+# which an offloaded search is stopped.
+_STOPPABLE = {depth_first_solve, breadth_first_solve,
+              bounded_breadth_first_solve, bidirectional_solve, astar_solve,
+              ida_star_solve, iterative_deepening_solve}
+
+async def async_solve(puzzle, strategy=depth_first_solve, every=1000,
+                      timeout=None, offload=False, executor=None,
+                      stats=None):
+    """
+    Return what strategy returns for puzzle, giving the event loop a turn
+    every `every` expansions.
+
+    The search is run on the event loop itself, a few expansions at a
+    time, when strategy is depth_first_solve or breadth_first_solve.
+    With offload, or any other strategy, it is run on executor (the
+    loop's default executor if None), which must run it in a thread of
+    this process.  Either way, the task raises asyncio.CancelledError
+    when cancelled, or asyncio.TimeoutError after timeout seconds.  The
+    search itself stops then too if strategy is one of the solvers of
+    puzzle_tools that take a callback; any other strategy, like
+    dlx_solve, runs on in its thread until it is done.
+
+    stats, if given, is filled in as by the solvers of puzzle_tools,
+    when strategy takes it.
+
+    @type puzzle: Puzzle
+    @type strategy: (Puzzle) -> PuzzleNode | None
+    @type every: int
+    @type timeout: float | None
+    @type offload: bool
+    @type executor: concurrent.futures.Executor | None
+    @type stats: SearchStats | None
+    @rtype: PuzzleNode | None
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog"}
+    >>> sol = asyncio.run(async_solve(WordLadderPuzzle("cat", "dog", ws), \
+    breadth_first_solve, every=1))
+    >>> print(sol.parent.parent.parent.puzzle)
+    From Word: cat to_word: dog
+    >>> sol = asyncio.run(async_solve(WordLadderPuzzle("cat", "dog", ws), \
+    offload=True))
+    >>> print(sol.puzzle)
+    From Word: dog to_word: dog
+    >>> from sudoku_dlx import dlx_solve
+    >>> from sudoku_puzzle import SudokuPuzzle
+    >>> s = SudokuPuzzle(4, [["A", "B", "C", "D"], ["C", "D", "A", "B"], \
+    ["B", "*", "D", "*"], ["*", "*", "*", "A"]], {"A", "B", "C", "D"})
+    >>> asyncio.run(async_solve(s, dlx_solve)).puzzle.is_solved()
+    True
+    >>> from grid_peg_solitaire_puzzle import GridPegSolitairePuzzle
+    >>> g = [["*", "*", "*", "*", "*"], ["*", "*", "*", "*", "*"], \
+    ["*", "*", ".", "*", "*"], ["*", "*", "*", "*", "*"], \
+    ["*", "*", "*", "*", "*"]]
+    >>> asyncio.run(async_solve(GridPegSolitairePuzzle(g, \
+    {"*", ".", "#"}), timeout=0.1)) # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ...
+    TimeoutError
+    """
+    if stats is None:
+        stats = SearchStats()
+    loop = asyncio.get_running_loop()
+    if offload or strategy not in (depth_first_solve, breadth_first_solve):
+        abort = threading.Event()
+        call = partial(strategy, puzzle)
+        if strategy in _STOPPABLE:
+            call = partial(strategy, puzzle, stats=stats,
+                           callback=lambda s: not abort.is_set(), every=every)
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, call), timeout)
+        finally:
+            # Stop the search in its thread if nobody is waiting for it.
+            abort.set()
+    deadline = None if timeout is None else loop.time() + timeout
+    frontier = deque([PuzzleNode(puzzle, lazy=True)])
+    for solution in iter_search(frontier, strategy is breadth_first_solve,
+                                stats=stats, every=every):
+        if solution is not None:
+            return solution
+        if deadline is not None and loop.time() >= deadline:
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(0)
+    return None
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
+    from time import time
+    from grid_peg_solitaire_puzzle import GridPegSolitairePuzzle
+
+    grid = [["#", "#", "*", "*", "*", "#", "#"],
+            ["#", "#", "*", "*", "*", "#", "#"],
+            ["*", "*", "*", "*", "*", "*", "*"],
+            ["*", "*", "*", ".", "*", "*", "*"],
+            ["*", "*", "*", "*", "*", "*", "*"],
+            ["#", "#", "*", "*", "*", "#", "#"],
+            ["#", "#", "*", "*", "*", "#", "#"]]
+
+    async def ticker(gaps):
+        # Record the gaps between turns of the event loop.
+        last = time()
+        while True:
+            await asyncio.sleep(0.01)
+            gaps.append(time() - last - 0.01)
+            last = time()
+
+    async def main():
+        gaps = []
+        tick = asyncio.ensure_future(ticker(gaps))
+        start = time()
+        try:
+            await async_solve(GridPegSolitairePuzzle(grid, {"*", ".", "#"}),
+                              every=10, timeout=3)
+        except asyncio.TimeoutError:
+            print("gave up on the English board after {} seconds".format(
+                time() - start))
+        tick.cancel()
+        print("longest the event loop was kept waiting: {} seconds".format(
+            max(gaps)))
+
+    asyncio.run(main())
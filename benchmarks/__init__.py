@@ -0,0 +1,13 @@
+"""
+Benchmarks for the puzzle solvers.
+
+Run every solver on the curated instances of instances.py and save the
+times, node counts and peak memory as JSON, from the top of the
+repository:
+
+    python -m benchmarks.run --out results.json
+
+and compare two saved runs, say from before and after a change:
+
+    python -m benchmarks.run --compare before.json results.json
+"""
@@ -0,0 +1,172 @@
+"""
+Curated benchmark instances of each kind of puzzle.
+
+Each instance is a tuple (kind, name, level, make), where make is a
+function of no arguments returning a new puzzle, so that building the
+puzzle is not timed and every run starts from a fresh one.  level is
+"easy", "medium" or "hard".
+"""
+import os
+from grid_peg_solitaire_puzzle import GridPegSolitairePuzzle, \
+    BitboardPegSolitairePuzzle
+from mn_puzzle import MNPuzzle
+from sudoku_puzzle import SudokuPuzzle, ConstraintSudokuPuzzle
+from word_index import load_words
+from word_ladder_puzzle import WordLadderPuzzle
+
+# The word list shipped with the repository.
+WORDS = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "words")
+
+_DIGITS = {"1", "2", "3", "4", "5", "6", "7", "8", "9"}
+
+# name -> (level, rows), the newspaper sudokus of sudoku_puzzle.py.
+_SUDOKUS = {
+    "July 9 2015 Star": ("easy", [
+        "***7*8*1*", "**7*9***6", "9*31*****", "35*8**6*1", "*********",
+        "1*6**9*48", "*****12*7", "8***7*4**", "*6*3*2***"]),
+    "3-star November 14th 2015": ("medium", [
+        "***9*2***", "*91***63*", "*3**7**8*", "3*******8", "**9***2**",
+        "5*******7", "*7**8**4*", "*45***81*", "***3*6***"]),
+    "4-star November 14th 2015": ("hard", [
+        "56***7**9", "*7**48*31", "*********", "43*******", "*8*****9*",
+        "*******26", "*********", "19*36**7*", "7**1***42"]),
+}
+
+# name -> (level, from_grid, to_grid); the names give the fewest moves.
+_TARGET_3X3 = ("123", "456", "78*")
+_TARGET_4X4 = ("1234", "5678", "9ABC", "DEF*")
+_MN_PUZZLES = {
+    "3x3 in 12": ("easy", ("513", "4*2", "786"), _TARGET_3X3),
+    "3x3 in 24": ("medium", ("837", "1*4", "652"), _TARGET_3X3),
+    "4x4 in 20": ("medium", ("5123", "8*C4", "967F", "DBAE"), _TARGET_4X4),
+    "4x4 in 30": ("hard", ("5172", "83AB", "9F*4", "D6EC"), _TARGET_4X4),
+}
+
+# (level, from_word, to_word)
+_LADDERS = [("easy", "cat", "dog"), ("easy", "ape", "man"),
+            ("medium", "same", "cost"), ("medium", "cold", "warm"),
+            ("medium", "head", "tail"), ("hard", "wheat", "bread")]
+
+# name -> (level, rows)
+_PEG_BOARDS = {
+    "3x4 corner": ("easy", [".***", "****", "****"]),
+    "5x5": ("medium", ["*****", "*****", "*****", "**.**", "*****"]),
+    "English": ("hard", ["##***##", "##***##", "*******", "***.***",
+                         "*******", "##***##", "##***##"]),
+}
+
+
+def sudoku_instances():
+    """
+    Return the sudoku instances, each also as a ConstraintSudokuPuzzle.
+
+    @rtype: list[(str, str, str, () -> SudokuPuzzle)]
+    """
+    result = []
+    for name in _SUDOKUS:
+        level, rows = _SUDOKUS[name]
+        for kind in (SudokuPuzzle, ConstraintSudokuPuzzle):
+            result.append(("sudoku", "{} ({})".format(name, kind.__name__),
+                           level, _maker(kind, 9, _grid(rows), _DIGITS)))
+    return result
+
+
+def mn_instances():
+    """
+    Return the MNPuzzle instances.
+
+    @rtype: list[(str, str, str, () -> MNPuzzle)]
+    """
+    result = []
+    for name in _MN_PUZZLES:
+        level, from_rows, to_rows = _MN_PUZZLES[name]
+        result.append(("mn", name, level,
+                       _maker(MNPuzzle, _tuple_grid(from_rows),
+                              _tuple_grid(to_rows))))
+    return result
+
+
+def word_ladder_instances():
+    """
+    Return the word ladder instances, using the words file.
+
+    @rtype: list[(str, str, str, () -> WordLadderPuzzle)]
+    """
+    return [("word ladder", "{}->{}".format(from_word, to_word), level,
+             _ladder_maker(from_word, to_word))
+            for level, from_word, to_word in _LADDERS]
+
+
+def peg_instances():
+    """
+    Return the peg solitaire boards, each as a GridPegSolitairePuzzle
+    and as a BitboardPegSolitairePuzzle.
+
+    @rtype: list[(str, str, str, () -> GridPegSolitairePuzzle)]
+    """
+    result = []
+    for name in _PEG_BOARDS:
+        level, rows = _PEG_BOARDS[name]
+        for kind in (GridPegSolitairePuzzle, BitboardPegSolitairePuzzle):
+            result.append(("peg solitaire",
+                           "{} ({})".format(name, kind.__name__), level,
+                           _maker(kind, _grid(rows), {"*", ".", "#"})))
+    return result
+
+
+def all_instances():
+    """
+    Return the instances of every kind of puzzle.
+
+    @rtype: list[(str, str, str, () -> Puzzle)]
+
+    >>> kinds = [kind for kind, name, level, make in all_instances()]
+    >>> sorted(set(kinds))
+    ['mn', 'peg solitaire', 'sudoku', 'word ladder']
+    >>> [make().is_solved() for kind, name, level, make in all_instances()]
+    ... # doctest: +ELLIPSIS
+    [False, False, ...]
+    """
+    return (sudoku_instances() + mn_instances() + word_ladder_instances() +
+            peg_instances())
+
+
+def _grid(rows):
+    # Return rows of strings as a list of lists of characters.
+    #
+    # @type rows: list[str]
+    # @rtype: list[list[str]]
+    return [list(row) for row in rows]
+
+
+def _tuple_grid(rows):
+    # Return rows of strings as a tuple of tuples of characters.
+    #
+    # @type rows: tuple[str]
+    # @rtype: tuple[tuple[str]]
+    return tuple(tuple(row) for row in rows)
+
+
+def _maker(kind, *args):
+    # Return a function making a new kind(*args), with fresh copies of
+    # any lists in args.
+    #
+    # @type kind: type
+    # @rtype: () -> Puzzle
+    def make():
+        return kind(*[[row[:] for row in arg] if isinstance(arg, list)
+                      else arg for arg in args])
+    return make
+
+
+def _ladder_maker(from_word, to_word):
+    # Return a function making a new WordLadderPuzzle from from_word to
+    # to_word with the words file.
+    #
+    # @type from_word: str
+    # @type to_word: str
+    # @rtype: () -> WordLadderPuzzle
+    def make():
+        return WordLadderPuzzle(from_word, to_word, load_words(WORDS))
+    return make
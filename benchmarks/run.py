@@ -0,0 +1,237 @@
+"""
+Run the solvers on the benchmark instances and save the results as JSON.
+
+Each result records the seconds taken, the nodes counted by SearchStats,
+the length of the path found and the peak memory traced by tracemalloc.
+The memory is measured in a second run of the same search, since tracing
+slows the search down too much for its time to mean anything.  A search
+running past the time budget is stopped through the SearchStats
+callback and recorded as aborted.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from benchmarks.instances import all_instances
+from puzzle_tools import depth_first_solve, breadth_first_solve, \
+    bounded_breadth_first_solve, bidirectional_solve, astar_solve, \
+    ida_star_solve, iterative_deepening_solve, SearchStats
+from sudoku_dlx import dlx_solve
+
+# The strategies run on each kind of puzzle by default.  Breadth-first
+# strategies are left out for sudoku and peg solitaire, whose solutions
+# are all at the same, greatest, depth.
+STRATEGIES = {
+    "sudoku": [depth_first_solve, dlx_solve],
+    "mn": [depth_first_solve, breadth_first_solve,
+           bounded_breadth_first_solve, iterative_deepening_solve,
+           bidirectional_solve, astar_solve, ida_star_solve],
+    "word ladder": [depth_first_solve, breadth_first_solve,
+                    bounded_breadth_first_solve, iterative_deepening_solve,
+                    bidirectional_solve, astar_solve, ida_star_solve],
+    "peg solitaire": [depth_first_solve, astar_solve],
+}
+# Strategies that take the stats, callback and every arguments.
+_COUNTED = {depth_first_solve, breadth_first_solve,
+            bounded_breadth_first_solve, iterative_deepening_solve,
+            bidirectional_solve, astar_solve, ida_star_solve}
+
+
+def run_one(make, strategy, budget, memory=True):
+    """
+    Solve the puzzle made by make with strategy, stopping after budget
+    seconds, and return the measurements as a dict.
+
+    @type make: () -> Puzzle
+    @type strategy: (Puzzle) -> PuzzleNode | None
+    @type budget: float
+    @type memory: bool
+    @rtype: dict
+
+    >>> from benchmarks.instances import mn_instances
+    >>> result = run_one(mn_instances()[0][3], astar_solve, 10)
+    >>> result["solved"], result["length"], result["aborted"]
+    (True, 12, False)
+    """
+    stats, solution, seconds = _search(make, strategy, budget)
+    result = {"seconds": seconds, "solved": solution is not None,
+              "length": None, "aborted": stats.aborted,
+              "generated": None, "expanded": None, "peak_frontier": None,
+              "peak_closed": None, "peak_memory": None}
+    if strategy in _COUNTED:
+        result.update(generated=stats.generated, expanded=stats.expanded,
+                      peak_frontier=stats.peak_frontier,
+                      peak_closed=stats.peak_closed)
+    if solution is not None:
+        result["length"] = 0
+        while solution.parent is not None:
+            result["length"] += 1
+            solution = solution.parent
+    if memory and not stats.aborted:
+        tracemalloc.start()
+        try:
+            _search(make, strategy, float("inf"))
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_all(kinds=None, levels=None, strategies=None, budget=30.0,
+            memory=True, report=None):
+    """
+    Run the default strategies, or those named in strategies, on the
+    benchmark instances of the given kinds and levels (all of them when
+    None), and return the results with a description of the run.
+
+    report, if given, is called with each result as it is ready.
+
+    @type kinds: list[str] | None
+    @type levels: list[str] | None
+    @type strategies: list[str] | None
+    @type budget: float
+    @type memory: bool
+    @type report: (dict) -> None | None
+    @rtype: dict
+    """
+    results = []
+    for kind, name, level, make in all_instances():
+        if ((kinds is not None and kind not in kinds) or
+                (levels is not None and level not in levels)):
+            continue
+        for strategy in STRATEGIES[kind]:
+            if strategies is not None and strategy.__name__ not in strategies:
+                continue
+            result = {"kind": kind, "instance": name, "level": level,
+                      "strategy": strategy.__name__}
+            result.update(run_one(make, strategy, budget, memory))
+            results.append(result)
+            if report is not None:
+                report(result)
+    return {"commit": _commit(), "python": platform.python_version(),
+            "platform": platform.platform(), "time": time.time(),
+            "budget": budget, "results": results}
+
+
+def compare(before, after):
+    """
+    Return lines comparing the seconds and nodes of each result in after
+    with the same instance and strategy in before.
+
+    @type before: dict
+    @type after: dict
+    @rtype: list[str]
+
+    >>> old = {"results": [{"instance": "a", "strategy": "s", \
+    "seconds": 2.0, "expanded": 10, "aborted": False}]}
+    >>> new = {"results": [{"instance": "a", "strategy": "s", \
+    "seconds": 1.0, "expanded": 10, "aborted": False}]}
+    >>> compare(old, new)
+    ['a, s: 2.000 -> 1.000 seconds (x0.50), 10 -> 10 expanded']
+    """
+    old = {}
+    for result in before["results"]:
+        old[(result["instance"], result["strategy"])] = result
+    lines = []
+    for result in after["results"]:
+        key = (result["instance"], result["strategy"])
+        if key not in old:
+            lines.append("{}, {}: new".format(*key))
+        elif old[key]["aborted"] or result["aborted"]:
+            lines.append("{}, {}: {} -> {}".format(
+                key[0], key[1], _outcome(old[key]), _outcome(result)))
+        else:
+            lines.append("{}, {}: {:.3f} -> {:.3f} seconds (x{:.2f}), "
+                         "{} -> {} expanded".format(
+                             key[0], key[1], old[key]["seconds"],
+                             result["seconds"],
+                             result["seconds"] / max(old[key]["seconds"],
+                                                     1e-9),
+                             old[key]["expanded"], result["expanded"]))
+    return lines
+
+
+def _search(make, strategy, budget):
+    # Solve a new puzzle from make with strategy, stopping after budget
+    # seconds.  Return the SearchStats, the solution and the seconds taken.
+    #
+    # @type make: () -> Puzzle
+    # @type strategy: (Puzzle) -> PuzzleNode | None
+    # @type budget: float
+    # @rtype: (SearchStats, PuzzleNode | None, float)
+    puzzle, stats = make(), SearchStats()
+    start = time.perf_counter()
+    if strategy in _COUNTED:
+        solution = strategy(puzzle, stats=stats, callback=lambda s: (
+            time.perf_counter() - start < budget), every=100)
+    else:
+        solution = strategy(puzzle)
+    return stats, solution, time.perf_counter() - start
+
+
+def _outcome(result):
+    # Return the time of result, or that it was aborted.
+    #
+    # @type result: dict
+    # @rtype: str
+    if result["aborted"]:
+        return "aborted"
+    return "{:.3f} seconds".format(result["seconds"])
+
+
+def _commit():
+    # Return the git commit of the working tree, or None outside git.
+    #
+    # @rtype: str | None
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"],
+                                       stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    """
+    Run the benchmarks from the command line.
+
+    @type argv: list[str] | None
+    @rtype: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        "\n")[0])
+    parser.add_argument("--kind", action="append",
+                        choices=sorted(STRATEGIES))
+    parser.add_argument("--level", action="append",
+                        choices=["easy", "medium", "hard"])
+    parser.add_argument("--strategy", action="append")
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="seconds before a search is stopped")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the second, memory-tracing run")
+    parser.add_argument("--out", help="file to save the results to")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two saved results instead")
+    args = parser.parse_args(argv)
+    if args.compare is not None:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            print("\n".join(compare(json.load(before), json.load(after))))
+        return
+
+    def report(result):
+        print("{kind}, {instance}, {strategy}: {outcome}, {expanded} "
+              "expanded, {peak_memory} bytes".format(
+                  outcome=_outcome(result), **result))
+        sys.stdout.flush()
+    results = run_all(args.kind, args.level, args.strategy, args.budget,
+                      not args.no_memory, report)
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Breadth-first enumeration of whole state spaces, kept on disk.
+
+Each layer of the search, the configurations first reached after the
+same number of extensions, is a file of the to_bytes records of its
+puzzles, sorted and without duplicates.  The next layer is made by
+expanding the records of the current one in chunks that are sorted in
+memory and saved as runs, then merging the runs and dropping every
+record found in the current or the previous layer.  Memory use is set
+by the chunk size, not by the size of the state space.
+
+Checking two layers is enough when every extension can be undone, as in
+MNPuzzle, or when no configuration can come back at a later depth, as in
+peg solitaire, where every jump takes away a peg.
+
+The number of records in each layer gives the distance histogram, the
+number of layers less one the largest distance from the start, and the
+last layer the configurations at that distance.
+"""
+from heapq import merge
+import os
+
+# Records read from a file at a time.
+_BLOCK = 4096
+
+
+def enumerate_layers(puzzle, directory, max_depth=None, chunk=1 << 20):
+    """
+    Save every layer of the breadth-first search from puzzle as a file in
+    directory, up to max_depth extensions away if given, and return the
+    number of configurations in each.
+
+    puzzle must implement to_bytes and from_bytes.  At most chunk
+    records are sorted in memory at once.
+
+    @type puzzle: Puzzle
+    @type directory: str
+    @type max_depth: int | None
+    @type chunk: int
+    @rtype: list[int]
+
+    >>> import tempfile
+    >>> from mn_puzzle import MNPuzzle
+    >>> target_grid = (("1", "2", "3"), ("4", "5", "*"))
+    >>> folder = tempfile.mkdtemp()
+    >>> sizes = enumerate_layers(MNPuzzle(target_grid, target_grid), \
+folder, chunk=50)
+    >>> sum(sizes), len(sizes) - 1
+    (360, 21)
+    >>> [p.from_grid for p in read_layer(MNPuzzle(target_grid, \
+target_grid), folder, 21)]
+    [(('4', '5', '*'), ('1', '2', '3'))]
+    """
+    size = len(puzzle.to_bytes())
+    sizes = [_write(layer_path(directory, 0), [puzzle.to_bytes()])]
+    while sizes[-1] != 0 and (max_depth is None or
+                              len(sizes) - 1 < max_depth):
+        depth = len(sizes) - 1
+        runs = _expand(puzzle, directory, depth, size, chunk)
+        try:
+            new = _unique(merge(*[_records(run, size) for run in runs]))
+            for old in range(max(depth - 1, 0), depth + 1):
+                new = _without(new, _records(layer_path(directory, old),
+                                             size))
+            sizes.append(_write(layer_path(directory, depth + 1), new))
+        finally:
+            for run in runs:
+                os.remove(run)
+    if sizes[-1] == 0:
+        os.remove(layer_path(directory, len(sizes) - 1))
+        sizes.pop()
+    return sizes
+
+
+def layer_path(directory, depth):
+    """
+    Return the path of the file of the layer depth extensions away from
+    the start, saved in directory by enumerate_layers.
+
+    @type directory: str
+    @type depth: int
+    @rtype: str
+    """
+    return os.path.join(directory, "layer-{:04d}.bin".format(depth))
+
+
+def read_layer(puzzle, directory, depth):
+    """
+    Generate the puzzles of the layer depth extensions away from puzzle,
+    saved in directory by enumerate_layers, in the order of their
+    records.
+
+    @type puzzle: Puzzle
+    @type directory: str
+    @type depth: int
+    @rtype: generator[Puzzle]
+    """
+    for record in _records(layer_path(directory, depth),
+                           len(puzzle.to_bytes())):
+        yield puzzle.from_bytes(record)
+
+
+def _expand(puzzle, directory, depth, size, chunk):
+    # Save the records of the extensions of the layer at depth as sorted
+    # runs of at most chunk records, and return the paths of the runs.
+    #
+    # @type puzzle: Puzzle
+    # @type directory: str
+    # @type depth: int
+    # @type size: int
+    # @type chunk: int
+    # @rtype: list[str]
+    runs, buffer = [], []
+    for record in _records(layer_path(directory, depth), size):
+        for ext in puzzle.from_bytes(record).extensions():
+            buffer.append(ext.to_bytes())
+        if len(buffer) >= chunk:
+            runs.append(_save_run(directory, len(runs), buffer))
+            buffer = []
+    if len(buffer) != 0 or len(runs) == 0:
+        runs.append(_save_run(directory, len(runs), buffer))
+    return runs
+
+
+def _save_run(directory, i, buffer):
+    # Save the records in buffer sorted, without duplicates, as run i in
+    # directory, and return its path.
+    #
+    # @type directory: str
+    # @type i: int
+    # @type buffer: list[bytes]
+    # @rtype: str
+    path = os.path.join(directory, "run-{:04d}.bin".format(i))
+    buffer.sort()
+    _write(path, _unique(buffer))
+    return path
+
+
+def _write(path, records):
+    # Write records to a new file at path and return how many there were.
+    #
+    # @type path: str
+    # @type records: iterable[bytes]
+    # @rtype: int
+    count = 0
+    with open(path, "wb") as f:
+        for record in records:
+            f.write(record)
+            count += 1
+    return count
+
+
+def _records(path, size):
+    # Generate the records of size bytes in the file at path.
+    #
+    # @type path: str
+    # @type size: int
+    # @rtype: generator[bytes]
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(size * _BLOCK)
+            if len(block) == 0:
+                return
+            for i in range(0, len(block), size):
+                yield block[i:i + size]
+
+
+def _unique(records):
+    # Generate the sorted records, leaving out repeats.
+    #
+    # @type records: iterable[bytes]
+    # @rtype: generator[bytes]
+    last = None
+    for record in records:
+        if record != last:
+            yield record
+            last = record
+
+
+def _without(records, others):
+    # Generate the sorted records that are not in the sorted others.
+    #
+    # @type records: iterable[bytes]
+    # @type others: iterator[bytes]
+    # @rtype: generator[bytes]
+    other = next(others, None)
+    for record in records:
+        while other is not None and other < record:
+            other = next(others, None)
+        if record != other:
+            yield record
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
+    import tempfile
+    from time import time
+    from mn_puzzle import MNPuzzle
+    from grid_peg_solitaire_puzzle import BitboardPegSolitairePuzzle
+
+    target_grid = (("1", "2", "3"), ("4", "5", "6"), ("7", "8", "*"))
+    start = time()
+    with tempfile.TemporaryDirectory() as folder:
+        sizes = enumerate_layers(MNPuzzle(target_grid, target_grid), folder,
+                                 chunk=50000)
+    print("3x3 puzzle: {} configurations, {} moves at most, distance "
+          "histogram {} ({} seconds)".format(sum(sizes), len(sizes) - 1,
+                                             sizes, time() - start))
+    grid = [["*", "*", "*", "*", "*"],
+            ["*", "*", "*", "*", "*"],
+            ["*", "*", "*", "*", "*"],
+            ["*", "*", ".", "*", "*"],
+            ["*", "*", "*", "*", "*"]]
+    start = time()
+    with tempfile.TemporaryDirectory() as folder:
+        sizes = enumerate_layers(BitboardPegSolitairePuzzle(
+            grid, {"*", ".", "#"}), folder)
+    print("5x5 peg solitaire: {} boards reachable, {} jumps at most "
+          "({} seconds)".format(sum(sizes), len(sizes) - 1, time() - start))
@@ -48,7 +48,48 @@ class GridPegSolitairePuzzle(Puzzle):
         '''
         # Check all the class attributes and class type.
         return (type(other) == type(self) and
-                       (self._marker == other._marker) and (self._marker_set == other._marker_set))      
+                       (self._marker == other._marker) and (self._marker_set == other._marker_set))
+
+    def __hash__(self):
+        '''(self) -> int
+        Return the hash of the puzzle, consistent with __eq__.
+        '''
+        return hash(self.state_key())
+
+    def state_key(self):
+        '''(self) -> tuple of str
+        Return the grid as a tuple of row strings.
+        >>> g = [['*','*','*','.','*','*'], ['#','*','.','.','*','#']]
+        >>> GridPegSolitairePuzzle(g, {"*", ".", "#"}).state_key()
+        ('***.**', '#*..*#')
+        '''
+        return tuple("".join(row) for row in self._marker)
+
+    def canonical_key(self):
+        '''(self) -> tuple of str
+        Return the smallest state_key among the rotations and reflections of
+        the grid: the four flips of any grid, plus the four flips of its
+        transpose when the grid is square. Unused positions are part of the
+        key, so a symmetry of the pegs that does not fit the board matches
+        nothing.
+        >>> g = [['*','.','.'], ['*','*','.'], ['.','.','.']]
+        >>> g2 = [['.','.','.'], ['.','*','*'], ['.','.','*']]
+        >>> a = GridPegSolitairePuzzle(g, {"*", ".", "#"})
+        >>> a.canonical_key() == GridPegSolitairePuzzle(g2, {"*", "."}).canonical_key()
+        True
+        >>> a.canonical_key()
+        ('**.', '.*.', '...')
+        '''
+        rows = self.state_key()
+        grids = [rows]
+        if len(rows) == len(rows[0]):
+            grids.append(tuple("".join(col) for col in zip(*rows)))
+        variants = []
+        for grid in grids:
+            variants.extend([grid, grid[::-1],
+                             tuple(row[::-1] for row in grid),
+                             tuple(row[::-1] for row in grid[::-1])])
+        return min(variants)
                 
     def __str__(self):
         '''(self) -> str
@@ -74,7 +115,18 @@ class GridPegSolitairePuzzle(Puzzle):
             ret += str(row) + '\n'
         # Return the string rep
         return ret
+
     # __repr__ is up to you
+    def __repr__(self):
+        '''(self) -> str
+        Return the string representation of the puzzle, the same for every
+        equal puzzle.
+        >>> GridPegSolitairePuzzle([["*", "*", "."]], {"*", ".", "#"})
+        GridPegSolitairePuzzle(['**.'], ['#', '*', '.'])
+        '''
+        return '{}({!r}, {!r})'.format(
+            type(self).__name__, ["".join(row) for row in self._marker],
+            sorted(self._marker_set))
 
     # TODO
     # override extensions
@@ -246,6 +298,389 @@ class GridPegSolitairePuzzle(Puzzle):
         # Return is_solved bool. 
         return is_solved
 
+    def heuristic(self):
+        '''(self) -> int or float
+        Return the number of jumps left to a solution. Every jump removes
+        exactly one peg, so this is one less than the number of pegs whenever
+        a solution exists. When two or more pegs are left and every one of them
+        is isolated (no peg next to it), no jump can ever be made again, so
+        return inf.
+        >>> g = [['*','*','*','.','*','*']]
+        >>> GridPegSolitairePuzzle(g, {"*", ".", "#"}).heuristic()
+        4
+        >>> g = [['*','.','*','.','.','*']]
+        >>> GridPegSolitairePuzzle(g, {"*", ".", "#"}).heuristic()
+        inf
+        '''
+        pegs, isolated = self.count_pegs()
+        if pegs > 1 and isolated == pegs:
+            return float('inf')
+        return max(pegs - 1, 0)
+
+    def count_pegs(self):
+        '''(self) -> tuple of ints
+        Return the number of pegs on the grid and how many of them are
+        isolated, that is have no peg directly above, below, left or right.
+        >>> g = [['*','*','.','.','*']]
+        >>> GridPegSolitairePuzzle(g, {"*", ".", "#"}).count_pegs()
+        (3, 1)
+        '''
+        marker = self._marker
+        pegs, isolated = 0, 0
+        for row in range(len(marker)):
+            for col in range(len(marker[row])):
+                if marker[row][col] == "*":
+                    pegs += 1
+                    # Look for a peg on each side.
+                    if not ((row > 0 and marker[row - 1][col] == "*") or
+                            (row + 1 < len(marker) and
+                             marker[row + 1][col] == "*") or
+                            (col > 0 and marker[row][col - 1] == "*") or
+                            (col + 1 < len(marker[row]) and
+                             marker[row][col + 1] == "*")):
+                        isolated += 1
+        return pegs, isolated
+
+
+class BitboardPegSolitairePuzzle(Puzzle):
+    """
+    Snapshot of peg solitaire on a rectangular grid, stored as bitboards:
+    bit row * width + col of an int is set for each peg, and of another
+    for each unused ("#") position. May be solved, unsolved, or even
+    unsolvable.
+    """
+
+    __slots__ = ("_board", "_pegs", "_marker_set")
+
+    def __init__(self, marker, marker_set):
+        """
+        Create a new BitboardPegSolitairePuzzle self with
+        marker indicating pegs, spaces, and unused
+        and marker_set indicating allowed markers.
+
+        @type marker: list[list[str]]
+        @type marker_set: set[str]
+                          "#" for unused, "*" for peg, "." for empty
+        """
+        # Check the grid the way GridPegSolitairePuzzle does.
+        GridPegSolitairePuzzle(marker, marker_set)
+        pegs, blocked = 0, 0
+        for row in range(len(marker)):
+            for col in range(len(marker[row])):
+                bit = 1 << (row * len(marker[0]) + col)
+                if marker[row][col] == "*":
+                    pegs |= bit
+                elif marker[row][col] == "#":
+                    blocked |= bit
+        self._board = _Board.of(len(marker), len(marker[0]), blocked)
+        self._pegs, self._marker_set = pegs, marker_set
+
+    def _with_pegs(self, pegs):
+        '''(self, int) -> BitboardPegSolitairePuzzle
+        Helper Method: Return a puzzle on the same board as self with pegs.
+        '''
+        puzzle = BitboardPegSolitairePuzzle.__new__(BitboardPegSolitairePuzzle)
+        puzzle._board, puzzle._pegs = self._board, pegs
+        puzzle._marker_set = self._marker_set
+        return puzzle
+
+    def __eq__(self, other):
+        '''(self, BitboardPegSolitairePuzzle) -> bool
+        Return True if both of the puzzle are exact same or else False.
+        >>> grid = [["*", "*", "."], ["#", "*", "*"]]
+        >>> bp = BitboardPegSolitairePuzzle(grid, {"*", ".", "#"})
+        >>> bp == BitboardPegSolitairePuzzle(grid, {"*", ".", "#"})
+        True
+        >>> bp == bp.extensions()[0]
+        False
+        '''
+        return (type(other) == type(self) and self._pegs == other._pegs and
+                self._board is other._board and
+                self._marker_set == other._marker_set)
+
+    def __hash__(self):
+        '''(self) -> int
+        Return the hash of the puzzle, consistent with __eq__.
+        '''
+        return hash(self._pegs)
+
+    def state_key(self):
+        '''(self) -> int
+        Return the peg bitboard.
+        >>> grid = [["*", "*", "."], ["#", "*", "*"]]
+        >>> BitboardPegSolitairePuzzle(grid, {"*", ".", "#"}).state_key()
+        51
+        '''
+        return self._pegs
+
+    def to_bytes(self):
+        '''(self) -> bytes
+        Return the peg bitboard, in as many bytes as the board needs.
+        >>> grid = [["*", "*", "."], ["#", "*", "*"]]
+        >>> bp = BitboardPegSolitairePuzzle(grid, {"*", ".", "#"})
+        >>> bp.to_bytes()
+        b'3'
+        >>> bp.from_bytes(bp.to_bytes()) == bp
+        True
+        '''
+        board = self._board
+        return self._pegs.to_bytes((board.rows * board.cols + 7) // 8, "big")
+
+    def from_bytes(self, data):
+        '''(self, bytes) -> BitboardPegSolitairePuzzle
+        Return the puzzle on the same board as self with the pegs of data,
+        returned by to_bytes.
+        '''
+        return self._with_pegs(int.from_bytes(data, "big"))
+
+    def canonical_key(self):
+        '''(self) -> int
+        Return the smallest peg bitboard among the rotations and reflections
+        of the board that map its unused positions onto themselves.
+        >>> g = [['*','.','.'], ['*','*','.'], ['.','.','.']]
+        >>> g2 = [['.','.','.'], ['.','*','*'], ['.','.','*']]
+        >>> a = BitboardPegSolitairePuzzle(g, {"*", ".", "#"})
+        >>> b = BitboardPegSolitairePuzzle(g2, {"*", ".", "#"})
+        >>> a.canonical_key() == b.canonical_key()
+        True
+        '''
+        return min(_Board.transform(self._pegs, table)
+                   for table in self._board.symmetries())
+
+    @property
+    def _marker(self):
+        '''(self) -> list of list of str
+        The grid of markers, as GridPegSolitairePuzzle stores it.
+        '''
+        board, pegs = self._board, self._pegs
+        marker = []
+        for row in range(board.rows):
+            marker.append([])
+            for col in range(board.cols):
+                bit = 1 << (row * board.cols + col)
+                if pegs & bit:
+                    marker[row].append("*")
+                elif board.blocked & bit:
+                    marker[row].append("#")
+                else:
+                    marker[row].append(".")
+        return marker
+
+    def __str__(self):
+        '''(self) -> str
+        Returns the string representation of the puzzle
+        >>> grid = [["*", "*", "."], ["#", "*", "*"]]
+        >>> print(BitboardPegSolitairePuzzle(grid, {"*", ".", "#"}))
+        ['*', '*', '.']
+        ['#', '*', '*']
+        <BLANKLINE>
+        '''
+        return GridPegSolitairePuzzle.__str__(self)
+
+    def __repr__(self):
+        '''(self) -> str
+        Return the string representation of the puzzle, the same for every
+        equal puzzle.
+        >>> BitboardPegSolitairePuzzle([["*", "*", "."]], {"*", ".", "#"})
+        BitboardPegSolitairePuzzle(['**.'], ['#', '*', '.'])
+        '''
+        return GridPegSolitairePuzzle.__repr__(self)
+
+    def to_grid_puzzle(self):
+        '''(self) -> GridPegSolitairePuzzle
+        Return the same configuration as a GridPegSolitairePuzzle.
+        '''
+        return GridPegSolitairePuzzle(self._marker, self._marker_set)
+
+    def extensions(self):
+        '''(self) -> list of puzzle obj
+        Retrun a list with all the legal extensions, in the same order as
+        GridPegSolitairePuzzle.extensions.
+        >>> g = [['*','*','*','.','*','*']]
+        >>> e = BitboardPegSolitairePuzzle(g, {"*", ".", "#"}).extensions()
+        >>> print(e[0])
+        ['*', '*', '*', '*', '.', '.']
+        <BLANKLINE>
+        >>> print(e[1])
+        ['*', '.', '.', '*', '*', '*']
+        <BLANKLINE>
+        '''
+        pegs = self._pegs
+        extensions = []
+        for target, jumpers, move in self._board.jumps:
+            # The target must be empty and both jumpers pegs.
+            if not pegs & target and pegs & jumpers == jumpers:
+                extensions.append(self._with_pegs(pegs ^ move))
+        return extensions
+
+    def is_solved(self):
+        '''(self) -> bool
+        Return True if the puzzle is solved, else False
+        >>> g = [['.','.','*','.']]
+        >>> BitboardPegSolitairePuzzle(g, {"*", ".", "#"}).is_solved()
+        True
+        >>> g = [['*','*','*','.','*','*']]
+        >>> BitboardPegSolitairePuzzle(g, {"*", ".", "#"}).is_solved()
+        False
+        '''
+        # At most one bit set.
+        return self._pegs & (self._pegs - 1) == 0
+
+    def heuristic(self):
+        '''(self) -> int or float
+        Return the number of jumps left to a solution, as
+        GridPegSolitairePuzzle.heuristic does.
+        >>> g = [['*','.','*','.','.','*']]
+        >>> BitboardPegSolitairePuzzle(g, {"*", ".", "#"}).heuristic()
+        inf
+        '''
+        pegs, isolated = self.count_pegs()
+        if pegs > 1 and isolated == pegs:
+            return float('inf')
+        return max(pegs - 1, 0)
+
+    def count_pegs(self):
+        '''(self) -> tuple of ints
+        Return the number of pegs on the grid and how many of them are
+        isolated, that is have no peg directly above, below, left or right.
+        >>> g = [['*','*','.','.','*']]
+        >>> BitboardPegSolitairePuzzle(g, {"*", ".", "#"}).count_pegs()
+        (3, 1)
+        '''
+        pegs, board = self._pegs, self._board
+        # Positions with a peg on some side.
+        beside = (((pegs << 1) & board.not_first_col) |
+                  ((pegs >> 1) & board.not_last_col) |
+                  (pegs << board.cols) | (pegs >> board.cols))
+        return bin(pegs).count("1"), bin(pegs & ~beside).count("1")
+
+
+class _Board:
+    """
+    The shape of a peg solitaire board and the jumps it allows, shared by
+    every BitboardPegSolitairePuzzle on a board of that shape.
+    """
+
+    # Boards made so far, by (rows, cols, blocked).
+    _boards = {}
+
+    def __init__(self, rows, cols, blocked):
+        """
+        Create the board with rows and cols positions, those in the
+        bitboard blocked unused.
+
+        @type self: _Board
+        @type rows: int
+        @type cols: int
+        @type blocked: int
+        @rtype: None
+        """
+        self.rows, self.cols, self.blocked = rows, cols, blocked
+        first_col = sum(1 << (row * cols) for row in range(rows))
+        last_col = first_col << (cols - 1)
+        full = (1 << (rows * cols)) - 1
+        self.not_first_col = full & ~first_col
+        self.not_last_col = full & ~last_col
+        # (target, jumpers, target | jumpers) for every jump, in the order
+        # GridPegSolitairePuzzle.extensions tries them.
+        self.jumps = []
+        for row in range(rows):
+            for col in range(cols):
+                for d_row, d_col in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                    cells = [(row + i * d_row, col + i * d_col)
+                             for i in range(3)]
+                    if all(0 <= r < rows and 0 <= c < cols for r, c in cells):
+                        bits = [1 << (r * cols + c) for r, c in cells]
+                        if not blocked & (bits[0] | bits[1] | bits[2]):
+                            self.jumps.append((bits[0], bits[1] | bits[2],
+                                               bits[0] | bits[1] | bits[2]))
+        # Lookup tables for the symmetries of the board, made when needed.
+        self._symmetries = None
+
+    def __reduce__(self):
+        """
+        Pickle _Board self as the arguments of _Board.of, so that it is
+        shared again when unpickled and its tables are not pickled.
+
+        @type self: _Board
+        @rtype: tuple
+
+        >>> import pickle
+        >>> g = [["*", "*", "*"], ["*", ".", "*"]]
+        >>> p = BitboardPegSolitairePuzzle(g, {"*", ".", "#"})
+        >>> pickle.loads(pickle.dumps(p)) == p
+        True
+        """
+        return _Board.of, (self.rows, self.cols, self.blocked)
+
+    def symmetries(self):
+        """
+        Return a lookup table for each rotation and reflection of the
+        board that maps its unused positions onto themselves, to be used
+        with _Board.transform.  The identity comes first.
+
+        @type self: _Board
+        @rtype: list[list[list[int]]]
+        """
+        if self._symmetries is None:
+            rows, cols = self.rows, self.cols
+            maps = [lambda r, c: (r, c), lambda r, c: (rows - 1 - r, c),
+                    lambda r, c: (r, cols - 1 - c),
+                    lambda r, c: (rows - 1 - r, cols - 1 - c)]
+            if rows == cols:
+                maps += [lambda r, c: (c, r), lambda r, c: (cols - 1 - c, r),
+                         lambda r, c: (c, rows - 1 - r),
+                         lambda r, c: (cols - 1 - c, rows - 1 - r)]
+            self._symmetries = []
+            for move in maps:
+                # Where each bit goes.
+                image = [0] * (rows * cols)
+                for r in range(rows):
+                    for c in range(cols):
+                        r2, c2 = move(r, c)
+                        image[r * cols + c] = 1 << (r2 * cols + c2)
+                # table[i][byte] is the image of byte at bits 8i..8i+7.
+                table = []
+                for start in range(0, rows * cols, 8):
+                    chunk = image[start:start + 8]
+                    table.append([sum(chunk[i] for i in range(len(chunk))
+                                      if byte >> i & 1)
+                                  for byte in range(256)])
+                if _Board.transform(self.blocked, table) == self.blocked:
+                    self._symmetries.append(table)
+        return self._symmetries
+
+    @staticmethod
+    def transform(bits, table):
+        """
+        Return the image of the bitboard bits under the symmetry with
+        lookup table table.
+
+        @type bits: int
+        @type table: list[list[int]]
+        @rtype: int
+        """
+        image = 0
+        for chunk in table:
+            image |= chunk[bits & 255]
+            bits >>= 8
+        return image
+
+    @classmethod
+    def of(cls, rows, cols, blocked):
+        """
+        Return the shared board with rows and cols positions and the
+        unused positions in blocked.
+
+        @type rows: int
+        @type cols: int
+        @type blocked: int
+        @rtype: _Board
+        """
+        if (rows, cols, blocked) not in cls._boards:
+            cls._boards[(rows, cols, blocked)] = _Board(rows, cols, blocked)
+        return cls._boards[(rows, cols, blocked)]
+
 
 if __name__ == "__main__":
     import doctest
@@ -265,4 +700,12 @@ if __name__ == "__main__":
     solution = depth_first_solve(gpsp)
     end = time.time()
     print("Solved 5x5 peg solitaire in {} seconds.".format(end - start))
-    print("Using depth-first: \n{}".format(solution))
\ No newline at end of file
+    print("Using depth-first: \n{}".format(solution))
+
+    start = time.time()
+    solution = depth_first_solve(
+        BitboardPegSolitairePuzzle(grid, {"*", ".", "#"}))
+    end = time.time()
+    print("Solved 5x5 peg solitaire with bitboards in {} seconds.".format(
+        end - start))
+    print("Using depth-first: \n{}".format(solution))
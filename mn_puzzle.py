@@ -1,12 +1,18 @@
 from puzzle import Puzzle
-from copy import deepcopy
+from bisect import bisect_left
 
 class MNPuzzle(Puzzle):
     """
     An nxm puzzle, like the 15-puzzle, which may be solved, unsolved,
     or even unsolvable.
+
+    The grid is stored row by row in one flat tuple, with the position of
+    the empty space kept alongside, so a move is a single swap.
     """
 
+    __slots__ = ("n", "m", "to_grid", "_cells", "_blank", "_target", "_goal",
+                 "_solvable", "_codes")
+
     def __init__(self, from_grid, to_grid):
         """
         MNPuzzle in state from_grid, working towards
@@ -23,7 +29,42 @@ class MNPuzzle(Puzzle):
         assert all([len(r) == len(from_grid[0]) for r in from_grid])
         assert all([len(r) == len(to_grid[0]) for r in to_grid])
         self.n, self.m = len(from_grid), len(from_grid[0])
-        self.from_grid, self.to_grid = from_grid, to_grid
+        self.to_grid = to_grid
+        self._cells = tuple(symbol for row in from_grid for symbol in row)
+        self._target = tuple(symbol for row in to_grid for symbol in row)
+        # index of the empty space in self._cells, -1 if there is none
+        self._blank = self._cells.index('*') if '*' in self._cells else -1
+        # index of each symbol in self._target, made by heuristic if needed
+        self._goal = None
+        # whether to_grid can be reached, worked out by fail_fast if needed
+        self._solvable = None
+        # symbols by byte and bytes by symbol, made by to_bytes if needed
+        self._codes = None
+
+    def _moved(self, cells, blank):
+        '''(self, tuple, int) -> MNPuzzle
+        Helper Method: Return a puzzle like self, but with the flat grid
+        cells, which has its empty space at index blank.
+        '''
+        puzzle = MNPuzzle.__new__(MNPuzzle)
+        puzzle.n, puzzle.m, puzzle.to_grid = self.n, self.m, self.to_grid
+        puzzle._target, puzzle._goal = self._target, self._goal
+        # Moves never change whether to_grid can be reached.
+        puzzle._solvable = self._solvable
+        puzzle._codes = self._codes
+        puzzle._cells, puzzle._blank = cells, blank
+        return puzzle
+
+    @property
+    def from_grid(self):
+        '''(self) -> tuple of tuple of str
+        The current configuration, row by row.
+        >>> start_grid = (("1", "2", "3"), ("4", "*", "5"))
+        >>> MNPuzzle(start_grid, start_grid).from_grid == start_grid
+        True
+        '''
+        cells, m = self._cells, self.m
+        return tuple(cells[i:i + m] for i in range(0, len(cells), m))
 
     # TODO
     # implement __eq__ and __str__
@@ -47,8 +88,8 @@ class MNPuzzle(Puzzle):
         # Check all the class attributes and class type.
         return (type(other) == type(self) and
                        self.n == other.n and self.m == other.m and
-                       self.to_grid == other.to_grid and self.from_grid ==
-                       other.from_grid)
+                       self._cells == other._cells and
+                       self.to_grid == other.to_grid)
             
     def __str__(self):
         '''(self) -> str
@@ -75,8 +116,70 @@ class MNPuzzle(Puzzle):
             to_grid += str(row)  + '\n'
         # Return the string rep.
         return "From Grid:" + '\n' + from_grid + 'To Grid' + '\n' + to_grid
-        
+
+    def __hash__(self):
+        '''(self) -> int
+        Return the hash of the puzzle, consistent with __eq__.
+        '''
+        return hash(self._cells)
+
+    def state_key(self):
+        '''(self) -> tuple
+        Return the current grid as one flat tuple, which identifies this
+        configuration among the puzzles working towards the same to_grid.
+        >>> start_grid = (("1", "2", "3"), ("4", "*", "5"))
+        >>> target_grid = (("1", "2", "3"), ("4", "5", "*"))
+        >>> a = MNPuzzle(start_grid, target_grid)
+        >>> a.state_key() == MNPuzzle(start_grid, start_grid).state_key()
+        True
+        >>> a.state_key() == a.extensions()[0].state_key()
+        False
+        '''
+        return self._cells
+
+    def to_bytes(self):
+        '''(self) -> bytes
+        Return the current grid with one byte per cell: the position of its
+        symbol among the symbols of the puzzle, in order.
+        >>> start_grid = (("1", "2", "3"), ("4", "*", "5"))
+        >>> target_grid = (("1", "2", "3"), ("4", "5", "*"))
+        >>> a = MNPuzzle(start_grid, target_grid)
+        >>> a.to_bytes()
+        b'\\x01\\x02\\x03\\x04\\x00\\x05'
+        >>> a.from_bytes(a.extensions()[0].to_bytes()) == a.extensions()[0]
+        True
+        '''
+        if self._codes is None:
+            symbols = tuple(sorted(set(self._cells) | set(self._target)))
+            assert len(symbols) <= 256
+            index = {}
+            for i in range(len(symbols)):
+                index[symbols[i]] = i
+            self._codes = (symbols, index)
+        index = self._codes[1]
+        return bytes([index[symbol] for symbol in self._cells])
+
+    def from_bytes(self, data):
+        '''(self, bytes) -> MNPuzzle
+        Return the puzzle working towards the same to_grid as self with the
+        grid data returned by to_bytes of a puzzle reached from self.
+        '''
+        if self._codes is None:
+            self.to_bytes()
+        symbols = self._codes[0]
+        cells = tuple([symbols[code] for code in data])
+        return self._moved(cells, cells.index('*') if '*' in cells else -1)
+
     # __repr__ is up to you
+    def __repr__(self):
+        '''(self) -> str
+        Return the string representation of the puzzle, the same for every
+        equal puzzle.
+        >>> MNPuzzle((("*", "1"),), (("1", "*"),))
+        MNPuzzle((('*', '1'),), (('1', '*'),))
+        '''
+        return 'MNPuzzle({!r}, {!r})'.format(
+            self.from_grid, tuple(tuple(row) for row in self.to_grid))
 
     # TODO
     # override extensions
@@ -118,52 +221,26 @@ class MNPuzzle(Puzzle):
         '''
         # List to store the extensions.
         extensions = []
-        # Call the get_space_coor method.
-        coor = self.get_space_coor()
-        # Get the row and column ints.
-        row, sub_row, to_grid = coor[0], coor[1], self.to_grid
-        # Down move
+        cells, blank, m = self._cells, self._blank, self.m
+        if blank < 0:
+            return extensions
+        row, sub_row = divmod(blank, m)
+        # Index of the symbol to slide for the down, up, right and left moves.
+        moves = []
         if row + 1 < self.n:
-            grid_copy = deepcopy(self.from_grid)
-            lst_grid = self.convert_to_lst(grid_copy)
-            # Make the moves by swapping the symbols.
-            value = lst_grid[row + 1][sub_row]
-            lst_grid[row + 1][sub_row] = '*'
-            lst_grid[row][sub_row] = value
-            # Create a MNPuzzle instances and append the list
-            extensions.append(MNPuzzle(self.convert_to_tuple(lst_grid), to_grid))    
-
-        # Up move
+            moves.append(blank + m)
         if row - 1 >= 0:
-            grid_copy = deepcopy(self.from_grid)
-            lst_grid = self.convert_to_lst(grid_copy)
-            # Make the moves
-            value = lst_grid[row - 1][sub_row]
-            lst_grid[row - 1][sub_row] = '*'
-            lst_grid[row][sub_row] = value
-            # Create a MNPuzzle instances and append the list
-            extensions.append(MNPuzzle(self.convert_to_tuple(lst_grid), to_grid))                    
-
-        # Right Move
-        if sub_row + 1 < self.m:
-            grid_copy = deepcopy(self.from_grid)
-            lst_grid = self.convert_to_lst(grid_copy)
-            # Make the moves
-            value = lst_grid[row][sub_row + 1]
-            lst_grid[row][sub_row + 1] = '*'
-            lst_grid[row][sub_row] = value
-            # Create a MNPuzzle instances and append the list
-            extensions.append(MNPuzzle(self.convert_to_tuple(lst_grid), to_grid))
-
-        # Left move
+            moves.append(blank - m)
+        if sub_row + 1 < m:
+            moves.append(blank + 1)
         if sub_row - 1 >= 0:
-            grid_copy = deepcopy(self.from_grid)
-            lst_grid = self.convert_to_lst(grid_copy)
-            value = lst_grid[row][sub_row - 1]
-            lst_grid[row][sub_row - 1] = '*'
-            lst_grid[row][sub_row] = value
-            extensions.append(MNPuzzle(self.convert_to_tuple(lst_grid), to_grid))              
-        return extensions  
+            moves.append(blank - 1)
+        for other in moves:
+            # Make the move by swapping the symbol with the empty space.
+            lst = list(cells)
+            lst[blank], lst[other] = lst[other], '*'
+            extensions.append(self._moved(tuple(lst), other))
+        return extensions
 
     def get_space_coor(self):
         '''(self) -> tuple of ints
@@ -175,23 +252,7 @@ class MNPuzzle(Puzzle):
         >>> a.get_space_coor()
         (0, 0)
         '''
-        # Counter vars.
-        row_coor = 0
-        space_coor = 0
-        # Get the coordinate of the empty space '*'
-        for sub_row in self.from_grid:
-            # Loop through the sub row.
-            for item in sub_row:
-                if item == '*':
-                    # Create a tuple with the coordinates
-                    empty_coor = (row_coor, space_coor)
-                space_coor += 1
-            # Increment the counter.
-            row_coor += 1
-            # Reset the counter.
-            space_coor = 0
-        # Return the coor.
-        return empty_coor
+        return divmod(self._blank, self.m)
 
     def convert_to_lst(self, grid):
         '''(self, tuple) -> list
@@ -224,14 +285,158 @@ class MNPuzzle(Puzzle):
         False
         '''
         # Check if the from_grid is equal to to_grid
-        return self.from_grid == self.to_grid
+        return self._cells == self._target
+
+    def fail_fast(self):
+        '''(self) -> bool
+        Return True if to_grid can never be reached from from_grid. This is
+        worked out once and shared with every extension, since moves never
+        change it. For grids with two or more rows and columns, each move
+        swaps "*" with a symbol and moves "*" by one position, so the parity
+        of the permutation taking from_grid to to_grid always matches the
+        parity of the distance "*" is away from its place in to_grid; when
+        every symbol is different, this is also enough for to_grid to be
+        reachable. In a single row or column the symbols other than "*" can
+        never change order.
+        >>> target_grid = (("1", "2", "3"), ("4", "5", "*"))
+        >>> MNPuzzle((("*", "2", "3"), ("1", "4", "5")), target_grid).fail_fast()
+        False
+        >>> MNPuzzle((("2", "1", "3"), ("4", "5", "*")), target_grid).fail_fast()
+        True
+        >>> MNPuzzle((("1", "*", "2"),), (("2", "1", "*"),)).fail_fast()
+        True
+        '''
+        if self._solvable is None:
+            self._solvable = self._can_reach_target()
+        return not self._solvable
+
+    def _can_reach_target(self):
+        '''(self) -> bool
+        Helper Method: Return whether to_grid can be reached from from_grid,
+        as explained in fail_fast.
+        '''
+        cells, target = self._cells, self._target
+        if sorted(cells) != sorted(target):
+            return False
+        if cells.count('*') != 1 or len(set(cells)) != len(cells):
+            # Without exactly one "*" and distinct symbols, assume the best.
+            return cells.count('*') > 0 or cells == target
+        if self.n == 1 or self.m == 1:
+            return ([x for x in cells if x != '*'] ==
+                    [x for x in target if x != '*'])
+        # Parity of the permutation taking each position's symbol to its
+        # place in to_grid: even iff the number of cycles has the same parity
+        # as the number of positions.
+        place = {}
+        for i in range(len(target)):
+            place[target[i]] = i
+        seen, cycles = [False] * len(cells), 0
+        for i in range(len(cells)):
+            if not seen[i]:
+                cycles += 1
+                while not seen[i]:
+                    seen[i] = True
+                    i = place[cells[i]]
+        row, col = divmod(self._blank, self.m)
+        goal_row, goal_col = divmod(place['*'], self.m)
+        distance = abs(row - goal_row) + abs(col - goal_col)
+        return (len(cells) - cycles) % 2 == distance % 2
+
+    def reversed_puzzle(self):
+        '''(self) -> MNPuzzle
+        Return the puzzle going from to_grid back to from_grid. Every slide
+        of a symbol into the empty space is undone by sliding it back.
+        >>> start_grid = (("*", "2", "3"), ("1", "4", "5"))
+        >>> target_grid = (("1", "2", "3"), ("4", "5", "*"))
+        >>> print(MNPuzzle(start_grid, target_grid).reversed_puzzle())
+        From Grid:
+        ('1', '2', '3')
+        ('4', '5', '*')
+        To Grid
+        ('*', '2', '3')
+        ('1', '4', '5')
+        <BLANKLINE>
+        '''
+        return MNPuzzle(self.to_grid, self.from_grid)
+
+    def heuristic(self):
+        '''(self) -> int
+        Return the Manhattan distance of every symbol from its place in
+        to_grid plus the linear conflicts, a lower bound on the number of
+        moves left. Each line (row or column) holding symbols that belong in
+        it needs two extra moves for every symbol that has to leave the line
+        so the rest can pass each other. Grids with repeated symbols get 0,
+        and grids with a symbol that to_grid lacks get inf.
+        >>> target_grid = (("1", "2", "3"), ("4", "5", "*"))
+        >>> MNPuzzle((("1", "2", "3"), ("4", "*", "5")), target_grid).heuristic()
+        1
+        >>> MNPuzzle((("2", "1", "3"), ("4", "5", "*")), target_grid).heuristic()
+        4
+        >>> MNPuzzle(target_grid, target_grid).heuristic()
+        0
+        >>> MNPuzzle((("1", "2", "6"), ("4", "5", "*")), target_grid).heuristic()
+        inf
+        '''
+        if self._goal is None:
+            # Goal index of every symbol, shared with the extensions.
+            self._goal = {}
+            for i in range(len(self._target)):
+                self._goal[self._target[i]] = i
+        goal, n, m = self._goal, self.n, self.m
+        if len(goal) != len(self._target) or len(self._cells) != len(goal):
+            # Repeated symbols: their goal positions are ambiguous.
+            return 0
+        distance = 0
+        # Goal columns of the symbols in each row that belong in that row,
+        # and goal rows of the symbols in each column belonging there.
+        row_lines = [[] for _ in range(n)]
+        col_lines = [[] for _ in range(m)]
+        for i in range(len(self._cells)):
+            symbol = self._cells[i]
+            if symbol not in goal:
+                # A symbol to_grid does not have can never be put in place.
+                return float('inf')
+            if symbol != '*':
+                row, col = divmod(i, m)
+                goal_row, goal_col = divmod(goal[symbol], m)
+                distance += abs(goal_row - row) + abs(goal_col - col)
+                if goal_row == row:
+                    row_lines[row].append(goal_col)
+                if goal_col == col:
+                    col_lines[col].append(goal_row)
+        for line in row_lines + col_lines:
+            # Symbols that stay are an increasing run; the others must move
+            # out of the line and back.
+            distance += 2 * (len(line) - _longest_increasing(line))
+        return distance
+
+
+def _longest_increasing(lst):
+    '''(list of int) -> int
+    Helper Function: Return the length of the longest strictly increasing
+    subsequence of lst.
+    >>> _longest_increasing([2, 0, 1])
+    2
+    '''
+    # tails[i] is the smallest tail of an increasing subsequence of length
+    # i + 1 seen so far.
+    tails = []
+    for item in lst:
+        i = bisect_left(tails, item)
+        if i == len(tails):
+            tails.append(item)
+        else:
+            tails[i] = item
+    return len(tails)
+
 
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
     target_grid = (("1", "2", "3"), ("4", "5", "*"))
     start_grid = (("*", "2", "3"), ("1", "4", "5"))
-    from puzzle_tools import breadth_first_solve, depth_first_solve
+    from puzzle_tools import breadth_first_solve, depth_first_solve, \
+        astar_solve
     from time import time
 
     start = time()
@@ -247,4 +452,9 @@ if __name__ == "__main__":
     solution = depth_first_solve((MNPuzzle(start_grid, target_grid)))
     end = time()
     print("DFS solved: \n\n{} \n\nin {} seconds".format(
-        solution, end - start))
\ No newline at end of file
+        solution, end - start))
+    start = time()
+    solution = astar_solve(MNPuzzle(start_grid, target_grid))
+    end = time()
+    print("A* solved: \n\n{} \n\nin {} seconds".format(
+        solution, end - start))
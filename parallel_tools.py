@@ -0,0 +1,364 @@
+"""
+Solve puzzles on several processes at once.
+"""
+from puzzle_tools import PuzzleNode, depth_first_solve, iter_search
+from word_index import WordIndex
+from collections import deque
+from multiprocessing import Pool, Process, Queue, Event, Value
+from queue import Empty
+import io
+import os
+import pickle
+import signal
+
+# Objects shared with the worker processes, by position; set up in each
+# worker by _start_worker.
+_shared = []
+# Expansions between checks for cancellation and idle workers in
+# parallel_depth_first_solve.
+_CHECK_EVERY = 200
+
+
+def solve_many(puzzles, strategy=depth_first_solve, workers=None,
+               timeout=None):
+    """
+    Solve each of puzzles with strategy on a pool of worker processes,
+    generating (i, solution, finished) for puzzles[i] as each one is
+    done, in the order they finish.
+
+    solution is what strategy returned, or None if the puzzle was not
+    finished within timeout seconds, in which case finished is False.
+    strategy must be a module-level function, like those in
+    puzzle_tools, so that it can be sent to the workers.  Timeouts need
+    a platform with SIGALRM and are ignored elsewhere.
+
+    Sets and word indexes shared by many puzzles, like the dictionary of
+    a batch of WordLadderPuzzles, are sent to each worker once rather
+    than with every puzzle, and the puzzles of each solution refer to
+    the caller's own objects again, so that puzzles comparing their
+    dictionaries by identity are equal to those they were made from.
+
+    @type puzzles: list[Puzzle]
+    @type strategy: (Puzzle) -> PuzzleNode | None
+    @type workers: int | None
+    @type timeout: float | None
+    @rtype: generator[(int, PuzzleNode | None, bool)]
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog"}
+    >>> puzzles = [WordLadderPuzzle("cat", "dog", ws),
+    ...            WordLadderPuzzle("cat", "cow", ws)]
+    >>> results = sorted(solve_many(puzzles, workers=2))
+    >>> print(results[0][1].puzzle)
+    From Word: dog to_word: dog
+    >>> results[1]
+    (1, None, True)
+    >>> sol = results[0][1]
+    >>> sol.parent.parent.parent.puzzle == puzzles[0]
+    True
+    """
+    shared, ids = [], {}
+    tasks = []
+    for i in range(len(puzzles)):
+        tasks.append((i, _dumps(puzzles[i], shared, ids, True), strategy,
+                      timeout))
+    pool = Pool(workers or os.cpu_count(), _start_worker,
+                (pickle.dumps(shared, pickle.HIGHEST_PROTOCOL),))
+    try:
+        for i, result, finished in pool.imap_unordered(_solve_one, tasks):
+            path = _loads(result, shared)
+            yield i, _path_to_node(path), finished
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def parallel_depth_first_solve(puzzle, workers=None, split_depth=2):
+    """
+    Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
+    a solution, with each child PuzzleNode containing an extension
+    of the puzzle in its parent.  Return None if this is not possible.
+
+    The puzzles split_depth extensions away from puzzle are shared out
+    to workers processes, each searching depth-first below the ones it
+    takes.  A worker that notices another one idle hands it the oldest
+    puzzle left on its stack, the root of its largest unsearched
+    subtree.  All the workers stop as soon as one finds a solution.
+    Each worker keeps its own visited set, so a configuration reachable
+    from two subtrees may be searched twice.
+
+    @type puzzle: Puzzle
+    @type workers: int | None
+    @type split_depth: int
+    @rtype: PuzzleNode | None
+
+    >>> from grid_peg_solitaire_puzzle import BitboardPegSolitairePuzzle
+    >>> g = [[".", "*", "*", "*"], ["*", "*", "*", "*"], ["*", "*", "*", "*"]]
+    >>> sol = parallel_depth_first_solve(BitboardPegSolitairePuzzle(g, \
+    {"*", ".", "#"}), workers=2)
+    >>> sol.puzzle.is_solved()
+    True
+    >>> parallel_depth_first_solve(BitboardPegSolitairePuzzle([["*", ".", \
+    "*"]], {"*", ".", "#"}), workers=2) is None
+    True
+    """
+    # Split the search at split_depth, breadth-first.
+    layer, visited = [PuzzleNode(puzzle, lazy=True)], set()
+    for _ in range(split_depth):
+        next_layer = []
+        for temp in layer:
+            key = temp.puzzle.state_key()
+            if key not in visited and not temp.puzzle.fail_fast():
+                visited.add(key)
+                if temp.puzzle.is_solved():
+                    return temp
+                for ext in temp.iter_children():
+                    next_layer.append(PuzzleNode(ext, parent=temp, lazy=True))
+        layer = next_layer
+    if len(layer) == 0:
+        return None
+    shared, ids = [], {}
+    tasks, results, found = Queue(), Queue(), Event()
+    # Tasks queued or being searched, and workers waiting for a task.
+    outstanding, idle = Value("i", len(layer)), Value("i", 0)
+    for temp in layer:
+        tasks.put(_dumps(_node_to_path(temp), shared, ids, True))
+    shared_data = pickle.dumps(shared, pickle.HIGHEST_PROTOCOL)
+    processes = [Process(target=_dfs_worker,
+                         args=(tasks, results, found, outstanding, idle,
+                               shared_data))
+                 for _ in range(workers or os.cpu_count())]
+    for process in processes:
+        process.start()
+    try:
+        path = None
+        while path is None and any(p.is_alive() for p in processes):
+            try:
+                path = _loads(results.get(timeout=0.1), shared)
+            except Empty:
+                pass
+        if path is None and not results.empty():
+            path = _loads(results.get(), shared)
+        return _path_to_node(path)
+    finally:
+        found.set()
+        # Subtrees still queued will never be read; do not wait for them to
+        # be flushed when this process exits.
+        tasks.cancel_join_thread()
+        results.cancel_join_thread()
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+
+
+def _dfs_worker(tasks, results, found, outstanding, idle, shared):
+    # Search the subtrees in tasks until one has a solution, which is put
+    # on results, or there are none left.
+    #
+    # @type tasks: Queue
+    # @type results: Queue
+    # @type found: Event
+    # @type outstanding: Value
+    # @type idle: Value
+    # @type shared: bytes
+    # @rtype: None
+    _start_worker(shared)
+    # This worker only stops once a solution is found or no subtrees are
+    # left, so it need not wait to flush the subtrees it handed out.
+    tasks.cancel_join_thread()
+    ids = {}
+    for j in range(len(_shared)):
+        ids[id(_shared[j])] = j
+    while not found.is_set():
+        with idle.get_lock():
+            idle.value += 1
+        try:
+            data = tasks.get(timeout=0.05)
+        except Empty:
+            data = None
+        with idle.get_lock():
+            idle.value -= 1
+        if data is None:
+            if outstanding.value == 0:
+                return
+            continue
+        solution = _search_subtree(_path_to_node(_loads(data, _shared)),
+                                   tasks, found, outstanding, idle, ids)
+        if solution is not None:
+            results.put(_dumps(_node_to_path(solution), _shared, ids))
+            found.set()
+        with outstanding.get_lock():
+            outstanding.value -= 1
+
+
+def _search_subtree(node, tasks, found, outstanding, idle, ids):
+    # Search depth-first below PuzzleNode node, as depth_first_solve does,
+    # handing the oldest node on the stack to tasks whenever a worker is
+    # idle, and giving up if found is set.
+    #
+    # @type node: PuzzleNode
+    # @type tasks: Queue
+    # @type found: Event
+    # @type outstanding: Value
+    # @type idle: Value
+    # @type ids: dict[int, int]
+    # @rtype: PuzzleNode | None
+    stack = deque([node])
+    for solution in iter_search(stack, every=_CHECK_EVERY):
+        if solution is not None:
+            return solution
+        if found.is_set():
+            return None
+        if idle.value > 0 and len(stack) > 1:
+            with outstanding.get_lock():
+                outstanding.value += 1
+            tasks.put(_dumps(_node_to_path(stack.popleft()), _shared, ids))
+    return None
+
+
+def _start_worker(shared):
+    # Set up a worker process with the pickled shared objects.
+    #
+    # @type shared: bytes
+    # @rtype: None
+    global _shared
+    _shared = pickle.loads(shared)
+
+
+def _solve_one(task):
+    # Solve one puzzle in a worker process.  Return its index, the path to
+    # the solution pickled for _loads, and whether it finished in time.
+    #
+    # @type task: (int, bytes, (Puzzle) -> PuzzleNode | None, float | None)
+    # @rtype: (int, bytes, bool)
+    i, data, strategy, timeout = task
+    puzzle = _loads(data, _shared)
+    timed = timeout is not None and hasattr(signal, "SIGALRM")
+    if timed:
+        signal.signal(signal.SIGALRM, _time_up)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        solution, finished = strategy(puzzle), True
+    except _TimeUp:
+        solution, finished = None, False
+    finally:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    ids = {}
+    for j in range(len(_shared)):
+        ids[id(_shared[j])] = j
+    return i, _dumps(_node_to_path(solution), _shared, ids), finished
+
+
+class _TimeUp(Exception):
+    """
+    Raised in a worker process when a puzzle runs out of time.
+    """
+    pass
+
+
+def _time_up(signum, frame):
+    # Signal handler for the end of a puzzle's time.
+    raise _TimeUp()
+
+
+def _node_to_path(node):
+    # Return the puzzles from the root of node's path down to node,
+    # or None if node is None.
+    #
+    # @type node: PuzzleNode | None
+    # @rtype: list[Puzzle] | None
+    if node is None:
+        return None
+    path = []
+    while node is not None:
+        path.append(node.puzzle)
+        node = node.parent
+    path.reverse()
+    return path
+
+
+def _path_to_node(path):
+    # Return the last PuzzleNode of a chain through the puzzles of path,
+    # or None if path is None.
+    #
+    # @type path: list[Puzzle] | None
+    # @rtype: PuzzleNode | None
+    if path is None:
+        return None
+    node = None
+    for puzzle in path:
+        node = PuzzleNode(puzzle, parent=node, lazy=True)
+    return node
+
+
+def _dumps(obj, shared, ids, grow=False):
+    # Return obj pickled, with every set, frozenset and WordIndex in it
+    # replaced by its position in shared; ids maps id(x) to the position
+    # of x in shared.  With grow, those not in shared yet are added to it;
+    # otherwise, as in the worker processes, whose shared list is fixed,
+    # they are pickled in full.
+    #
+    # @type obj: object
+    # @type shared: list
+    # @type ids: dict[int, int]
+    # @type grow: bool
+    # @rtype: bytes
+    f = io.BytesIO()
+    pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+
+    def persistent_id(x):
+        if isinstance(x, (set, frozenset, WordIndex)):
+            if id(x) not in ids and grow:
+                ids[id(x)] = len(shared)
+                shared.append(x)
+            return ids.get(id(x))
+        return None
+    pickler.persistent_id = persistent_id
+    pickler.dump(obj)
+    return f.getvalue()
+
+
+def _loads(data, shared):
+    # Return the object pickled by _dumps, taking sets from shared.
+    #
+    # @type data: bytes
+    # @type shared: list
+    # @rtype: object
+    unpickler = pickle.Unpickler(io.BytesIO(data))
+    unpickler.persistent_load = shared.__getitem__
+    return unpickler.load()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
+    from time import time
+    from word_index import load_words
+    from word_ladder_puzzle import WordLadderPuzzle
+    from puzzle_tools import breadth_first_solve
+
+    word_set = load_words("words")
+    pairs = [("same", "cost"), ("cold", "warm"), ("head", "tail"),
+             ("lead", "gold"), ("ape", "man"), ("wheat", "bread")] * 4
+    puzzles = [WordLadderPuzzle(a, b, word_set) for a, b in pairs]
+    start = time()
+    for i, solution, finished in solve_many(puzzles, breadth_first_solve,
+                                            timeout=30):
+        pass
+    print("solved {} word ladders in {} seconds".format(len(puzzles),
+                                                        time() - start))
+
+    from grid_peg_solitaire_puzzle import BitboardPegSolitairePuzzle
+    grid = [["*", "*", "*", "*", "*"],
+            ["*", "*", "*", "*", "*"],
+            ["*", "*", "*", "*", "*"],
+            ["*", "*", ".", "*", "*"],
+            ["*", "*", "*", "*", "*"]]
+    start = time()
+    solution = parallel_depth_first_solve(
+        BitboardPegSolitairePuzzle(grid, {"*", ".", "#"}))
+    print("solved 5x5 peg solitaire on {} processes in {} seconds".format(
+        os.cpu_count(), time() - start))
@@ -0,0 +1,251 @@
+"""
+Additive pattern databases for MNPuzzle.
+
+A pattern is a group of the symbols of an MNPuzzle.  Forgetting every
+other symbol, the fewest moves of pattern symbols needed to put the
+pattern in its place in to_grid is a lower bound on the moves needed to
+solve the puzzle.  When the patterns are disjoint, no move is counted by
+two of them, so the bounds of all the patterns add up to a lower bound
+too: a heuristic for astar_solve and ida_star_solve in puzzle_tools.
+
+The bounds are worked out ahead of time by breadth-first search back
+from to_grid over the abstracted configurations, and saved one byte per
+placement of each pattern.  PatternDatabase.load maps the file into
+memory instead of reading it, so processes sharing a database share one
+copy of it.
+"""
+from collections import deque
+import json
+import mmap
+
+# First line of every pattern database file.
+_MAGIC = b"MNPDB1\n"
+# Stored for placements that can never be reached.
+_UNREACHED = 255
+
+
+def build_pattern_database(to_grid, path, patterns=None):
+    """
+    Work out the pattern database of each of patterns for puzzles
+    working towards to_grid, save them at path and return them loaded.
+
+    The default patterns split the symbols of to_grid, in reading order,
+    into groups of at most six, or of four on a 3x3 grid.  Building
+    takes time and memory that grow with the number of positions to the
+    power of the largest pattern size plus one; a 6-6-3 split of the
+    15-puzzle is a long offline job.
+
+    @type to_grid: tuple[tuple[str]]
+    @type path: str
+    @type patterns: list[list[str]] | None
+    @rtype: PatternDatabase
+
+    >>> import os, tempfile
+    >>> target_grid = (("1", "2", "3"), ("4", "5", "*"))
+    >>> path = os.path.join(tempfile.mkdtemp(), "2x3.pdb")
+    >>> pdb = build_pattern_database(target_grid, path, [["1", "2"], ["3", "4", "5"]])
+    >>> from mn_puzzle import MNPuzzle
+    >>> pdb(MNPuzzle((("*", "2", "3"), ("1", "4", "5")), target_grid))
+    3
+    >>> pdb(MNPuzzle((("*", "2", "6"), ("1", "4", "5")), target_grid))
+    inf
+    >>> pdb.close()
+    """
+    n, m = len(to_grid), len(to_grid[0])
+    target = [symbol for row in to_grid for symbol in row]
+    assert target.count("*") == 1 and len(set(target)) == len(target)
+    if patterns is None:
+        symbols = [symbol for symbol in target if symbol != "*"]
+        size = 4 if n * m == 9 else 6
+        patterns = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+    assert all(symbol in target and symbol != "*"
+               for pattern in patterns for symbol in pattern)
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(json.dumps({"to_grid": [list(row) for row in to_grid],
+                            "patterns": patterns}).encode() + b"\n")
+        for pattern in patterns:
+            f.write(_pattern_table(n, m, target, pattern))
+    return PatternDatabase.load(path)
+
+
+def _pattern_table(n, m, target, pattern):
+    # Return the fewest pattern moves from each placement of pattern to
+    # target, indexed as in PatternDatabase.
+    #
+    # @type n: int
+    # @type m: int
+    # @type target: list[str]
+    # @type pattern: list[str]
+    # @rtype: bytearray
+    size = n * m
+    # Positions next to each position.
+    beside = []
+    for i in range(size):
+        row, col = divmod(i, m)
+        beside.append([j for j, ok in ((i - m, row > 0), (i + m, row < n - 1),
+                                       (i - 1, col > 0), (i + 1, col < m - 1))
+                       if ok])
+    weights = [size ** k for k in range(len(pattern))]
+    start = sum(target.index(pattern[k]) * weights[k]
+                for k in range(len(pattern)))
+    # Abstract state: placement index * size + position of the empty space.
+    # A move of a pattern symbol costs 1 and any other move 0, so the
+    # search is a 0-1 breadth-first search.
+    distance = bytearray([_UNREACHED]) * (size ** len(pattern) * size)
+    state = start * size + target.index("*")
+    distance[state] = 0
+    queue = deque([state])
+    while len(queue) != 0:
+        state = queue.popleft()
+        placement, blank = divmod(state, size)
+        d = distance[state]
+        # Which pattern symbol, if any, is at each position.
+        at = {}
+        rest = placement
+        for k in range(len(pattern)):
+            rest, position = divmod(rest, size)
+            at[position] = k
+        for other in beside[blank]:
+            if other in at:
+                # The pattern symbol slides from other into blank.
+                new = (placement + (blank - other) * weights[at[other]]) * \
+                    size + other
+                if d + 1 < distance[new]:
+                    distance[new] = d + 1
+                    queue.append(new)
+            else:
+                new = placement * size + other
+                if d < distance[new]:
+                    distance[new] = d
+                    queue.appendleft(new)
+    # Forget where the empty space is.
+    return bytearray(min(distance[i:i + size])
+                     for i in range(0, len(distance), size))
+
+
+class PatternDatabase:
+    """
+    Saved pattern databases for puzzles working towards one to_grid,
+    callable as a heuristic.
+
+    The table of a pattern has one byte for each placement of its
+    symbols: the symbol pattern[k] at position p_k, counting positions
+    row by row from 0, has index p_0 + p_1 * nm + p_2 * (nm)^2 + ...
+    """
+
+    def __init__(self, to_grid, patterns, tables, closer=None):
+        """
+        Create a new PatternDatabase self for puzzles working towards
+        to_grid, with the table of each of patterns.
+
+        @type self: PatternDatabase
+        @type to_grid: tuple[tuple[str]]
+        @type patterns: list[list[str]]
+        @type tables: list[bytes | memoryview]
+        @type closer: (() -> None) | None
+        @rtype: None
+        """
+        self.to_grid, self.patterns = to_grid, patterns
+        self._tables, self._closer = tables, closer
+
+    @classmethod
+    def load(cls, path):
+        """
+        Return the pattern databases saved at path, mapped into memory
+        read-only.
+
+        @type path: str
+        @rtype: PatternDatabase
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        assert data[:len(_MAGIC)] == _MAGIC
+        end = data.find(b"\n", len(_MAGIC))
+        header = json.loads(data[len(_MAGIC):end].decode())
+        to_grid = tuple(tuple(row) for row in header["to_grid"])
+        size = len(to_grid) * len(to_grid[0])
+        view, offset, tables = memoryview(data), end + 1, []
+        for pattern in header["patterns"]:
+            tables.append(view[offset:offset + size ** len(pattern)])
+            offset += size ** len(pattern)
+
+        def close():
+            # Release the views before the map they look into.
+            for table in tables:
+                table.release()
+            view.release()
+            data.close()
+        return PatternDatabase(to_grid, header["patterns"], tables, close)
+
+    def close(self):
+        """
+        Unmap the file PatternDatabase self was loaded from, if any.
+
+        @type self: PatternDatabase
+        @rtype: None
+        """
+        if self._closer is not None:
+            self._closer()
+            self._closer = None
+
+    def __call__(self, puzzle):
+        """
+        Return the sum of the pattern database bounds for puzzle, a lower
+        bound on the moves needed to solve it; inf if some pattern can
+        never be put in place.
+
+        @type self: PatternDatabase
+        @type puzzle: MNPuzzle
+        @rtype: int | float
+        """
+        assert puzzle.to_grid == self.to_grid
+        cells = puzzle.state_key()
+        size = len(cells)
+        where = {}
+        for i in range(size):
+            where[cells[i]] = i
+        total = 0
+        for pattern, table in zip(self.patterns, self._tables):
+            index, weight = 0, 1
+            for symbol in pattern:
+                if symbol not in where:
+                    # puzzle lacks a symbol of to_grid.
+                    return float("inf")
+                index += where[symbol] * weight
+                weight *= size
+            if table[index] == _UNREACHED:
+                return float("inf")
+            total += table[index]
+        return total
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
+    import os
+    import random
+    import tempfile
+    from time import time
+    from mn_puzzle import MNPuzzle
+    from puzzle_tools import astar_solve
+
+    target_grid = (("1", "2", "3"), ("4", "5", "6"), ("7", "8", "*"))
+    start = time()
+    pdb = build_pattern_database(target_grid,
+                                 os.path.join(tempfile.mkdtemp(), "3x3.pdb"))
+    print("built 4-4 pattern database for 3x3 in {} seconds".format(
+        time() - start))
+    puzzle = MNPuzzle(target_grid, target_grid)
+    random.seed(0)
+    for _ in range(200):
+        puzzle = random.choice(puzzle.extensions())
+    puzzle = MNPuzzle(puzzle.from_grid, target_grid)
+    for name, heuristic in (("manhattan", None), ("pattern database", pdb)):
+        start = time()
+        solution = astar_solve(puzzle, heuristic)
+        end = time()
+        print("A* with {} heuristic solved {} in {} seconds".format(
+            name, puzzle, end - start))
+    pdb.close()
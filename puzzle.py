@@ -4,6 +4,8 @@ class Puzzle:
     or even unsolvable.
     """
 
+    __slots__ = ()
+
     def fail_fast(self):
         """
         Return True iff Puzzle self can never be extended to a solution.
@@ -39,3 +41,94 @@ class Puzzle:
         @rtype: generator[Puzzle]
         """
         raise NotImplementedError
+
+    def state_key(self):
+        """
+        Return a hashable key for the configuration of Puzzle self.
+
+        Two puzzles reached during the same search have equal keys iff
+        they are in the same configuration, so the key leaves out
+        whatever every extension shares with its parent (the target,
+        the dictionary, the allowed symbols).  The solvers in
+        puzzle_tools use it for their visited sets.
+
+        This is an abstract method that must be implemented
+        in a subclass.
+
+        @type self: Puzzle
+        @rtype: Hashable
+        """
+        raise NotImplementedError
+
+    def heuristic(self):
+        """
+        Return a lower bound on the number of extensions needed to get
+        from Puzzle self to a solution.
+
+        The estimate must never exceed the true number, so that
+        astar_solve and ida_star_solve in puzzle_tools still find the
+        shortest solutions; float("inf") means self can never be solved.
+        Override this in a subclass where you can estimate better than 0.
+
+        @type self: Puzzle
+        @rtype: int | float
+        """
+        return 0
+
+    def reversed_puzzle(self):
+        """
+        Return a Puzzle in the configuration that solves Puzzle self,
+        working back towards the current configuration of self, or None.
+
+        Every extension of the returned puzzle and of its extensions
+        must be undone by an extension the other way, so that a search
+        from both ends (bidirectional_solve in puzzle_tools) can be
+        joined into a path for self.  Override this in a subclass that
+        has a single known solution and reversible extensions.
+
+        @type self: Puzzle
+        @rtype: Puzzle | None
+        """
+        return None
+
+    def canonical_key(self):
+        """
+        Return a hashable key shared by Puzzle self and every puzzle
+        symmetric to it.
+
+        Symmetric puzzles are either all solvable or all not, so a
+        solver may search just one of them.  Override this in a subclass
+        whose configurations have symmetries; by default only equal
+        configurations share a key.
+
+        @type self: Puzzle
+        @rtype: Hashable
+        """
+        return self.state_key()
+
+    def to_bytes(self):
+        """
+        Return the configuration of Puzzle self as bytes.
+
+        Every puzzle reached from the same puzzle must give the same number
+        of bytes, and from_bytes must turn them back into the puzzle, so
+        that a search too big for memory can keep its states in files, as
+        external_bfs does.  Override this, with from_bytes, in a subclass
+        whose configurations have a compact fixed-size form.
+
+        @type self: Puzzle
+        @rtype: bytes
+        """
+        raise NotImplementedError
+
+    def from_bytes(self, data):
+        """
+        Return a puzzle like Puzzle self, in the configuration given by
+        data, which was returned by to_bytes of a puzzle reached from the
+        same puzzle as self.
+
+        @type self: Puzzle
+        @type data: bytes
+        @rtype: Puzzle
+        """
+        raise NotImplementedError
@@ -2,7 +2,12 @@
 Some functions for working with puzzles
 """
 from puzzle import Puzzle
+from array import array
 from collections import deque
+from contextlib import contextmanager
+from heapq import heappush, heappop
+from operator import methodcaller
+from time import perf_counter
 # set higher recursion limit
 # which is needed in PuzzleNode.__str__
 #import resource
@@ -26,35 +31,37 @@ sys.setrecursionlimit(10**6)
 # do NOT change the type contract
 # you are welcome to create any helper functions
 # you like
-def depth_first_solve(puzzle):
+def depth_first_solve(puzzle, symmetry=False, stats=None, callback=None,
+                      every=1000):
     """
     Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
     a solution, with each child containing an extension of the puzzle
     in its parent.  Return None if this is not possible.
 
+    With symmetry, puzzles with the same canonical_key are visited only
+    once, so symmetric copies of a dead end are not searched again.  This
+    only pays off when symmetric copies come up, as from a symmetric
+    starting configuration; otherwise every key is computed for nothing,
+    as with a sudoku whose givens break its symmetries.
+
+    If stats is given, it is filled in as the search goes.  callback is
+    called with the SearchStats every `every` expansions; if it returns
+    False the search stops and None is returned.
+
     @type puzzle: Puzzle
+    @type symmetry: bool
+    @type stats: SearchStats | None
+    @type callback: (SearchStats) -> bool | None
+    @type every: int
     @rtype: PuzzleNode
     """
+    stats = _watch(stats, callback, every)
     # Used as a stack
-    stack = []
-    # Append the puzzle to the list.
-    stack.append(PuzzleNode(puzzle, puzzle.extensions()))
-    # List to keep track of the visited nodes
-    visited = []
-     # Loop till the stack is empty.
-    while len(stack) != 0:
-        # Pop the item from the stack.
-        temp = stack.pop()
-        # Chck if the current puzzle is seen before or its unsolvable.
-        if temp not in visited and not temp.puzzle.fail_fast():
-            # Append the puzzle to the visited list.
-            visited.append(temp)
-            # Loop thorugh the extensions.
-            for ext in temp.puzzle.extensions():
-                stack.append(PuzzleNode(ext, ext.extensions(), temp))
-            if temp.puzzle.is_solved():
-                # Current temp node is the solution.
-                return temp
+    stack = deque([PuzzleNode(puzzle, lazy=True)])
+    with stats.phase("search"):
+        # The first solution reached is the one returned.
+        for solution in iter_search(stack, False, symmetry, stats):
+            return solution
     # Retrun None if there is no solution to the puzzle
     return None
 
@@ -66,44 +73,816 @@ def depth_first_solve(puzzle):
 # you like
 # Hint: you may find a queue useful, that's why
 # we imported deque
-def breadth_first_solve(puzzle):
+def breadth_first_solve(puzzle, symmetry=False, stats=None, callback=None,
+                        every=1000):
     """
     Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
     a solution, with each child PuzzleNode containing an extension
     of the puzzle in its parent.  Return None if this is not possible.
 
+    With symmetry, puzzles with the same canonical_key are visited only
+    once, so symmetric copies of a configuration are not searched again.
+    As for depth_first_solve, this only pays off from a starting
+    configuration that has symmetric copies to skip.
+
+    stats, callback and every are as for depth_first_solve.
+
     @type puzzle: Puzzle
+    @type symmetry: bool
+    @type stats: SearchStats | None
+    @type callback: (SearchStats) -> bool | None
+    @type every: int
     @rtype: PuzzleNode
     """
+    stats = _watch(stats, callback, every)
     # BFS and DFS looks the same, the only difference is BFS uses a queue. And
     # DFS uses a stack.
     # Got that from stackoverflow ^^
+    q = deque([PuzzleNode(puzzle, lazy=True)])
+    with stats.phase("search"):
+        for solution in iter_search(q, True, symmetry, stats):
+            return solution
+    # Retrun None if there is no solution to the puzzle
+    return None
+
 
-    # Call the deque functions
-    q = deque()
-    # Append the puzzle to the queue.
-    q.append(PuzzleNode(puzzle, puzzle.extensions()))
-    # List to keep track of the visited nodes
-    visited = []
-    # Loop till the queue is empty.
-    while len(q) != 0:
-        # Pop the item from the queue.
-        temp = q.popleft()
+def iter_search(frontier, breadth_first=False, symmetry=False, stats=None,
+                every=None):
+    """
+    Search from the PuzzleNodes in frontier, taking the newest first, as
+    depth_first_solve does, or with breadth_first the oldest first, as
+    breadth_first_solve does.  Generate each PuzzleNode containing a
+    solution as it is reached, without expanding it, and, if every is
+    given, None after every `every` expansions.
+
+    frontier is the search's own deque, so between the values generated
+    the caller may take nodes out of it or add some.  The nodes in it at
+    the start are counted as generated in stats, which is filled in as
+    for depth_first_solve.  The search stops when frontier is empty or
+    the callback of stats returns False.
+
+    @type frontier: deque[PuzzleNode]
+    @type breadth_first: bool
+    @type symmetry: bool
+    @type stats: SearchStats | None
+    @type every: int | None
+    @rtype: generator[PuzzleNode | None]
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog"}
+    >>> frontier = deque([PuzzleNode(WordLadderPuzzle("cat", "dog", ws), \
+    lazy=True)])
+    >>> steps = iter_search(frontier, True, every=1)
+    >>> next(steps), len(frontier)
+    (None, 1)
+    >>> print(next(s for s in steps if s is not None).puzzle)
+    From Word: dog to_word: dog
+    """
+    if stats is None:
+        stats = SearchStats()
+    state_key = methodcaller("canonical_key" if symmetry else "state_key")
+    take = frontier.popleft if breadth_first else frontier.pop
+    stats.generated += len(frontier)
+    # Set of the state keys of the visited puzzles.
+    visited = set()
+    # Loop till the frontier is empty.
+    while len(frontier) != 0:
+        temp = take()
+        key = state_key(temp.puzzle)
         # Chck if the current puzzle is seen before or its unsolvable.
-        if temp not in visited and not temp.puzzle.fail_fast():
-            # Append the puzzle to the visited list.
-            visited.append(temp)
-            # Loop thorugh the extensions.
-            for ext in temp.puzzle.extensions():
-                # Make tree node and append to the queue.
-                q.append(PuzzleNode(ext, ext.extensions(), temp))
+        if key in visited:
+            stats.duplicates += 1
+        elif temp.puzzle.fail_fast():
+            stats.pruned += 1
+        else:
+            # Add the puzzle's state to the visited set.
+            visited.add(key)
+            if temp.puzzle.is_solved():
+                # Current temp node is a solution.
+                yield temp
+                continue
+            # Loop thorugh the extensions, skipping states already seen.
+            # The extensions are only generated now that temp is expanded.
+            for ext in temp.iter_children():
+                if state_key(ext) not in visited:
+                    frontier.append(PuzzleNode(ext, parent=temp, lazy=True))
+                    stats.generated += 1
+                else:
+                    stats.duplicates += 1
+            if not stats.expand(len(frontier), len(visited)):
+                return
+            if every is not None and stats.expanded % every == 0:
+                yield None
+
+
+def bounded_breadth_first_solve(puzzle, max_nodes=10 ** 6, stats=None,
+                                callback=None, every=1000):
+    """
+    Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
+    a solution, with each child PuzzleNode containing an extension
+    of the puzzle in its parent.  Return None if this is not possible.
+
+    Like breadth_first_solve, but each state seen is kept only as its
+    state key and the index of its parent's key in an array, and only
+    the frontier holds puzzles; the path is rebuilt from the keys once a
+    solution is found.  If more than max_nodes states are seen, the
+    search is given up and the puzzle is solved by
+    iterative_deepening_solve instead, which needs memory only for the
+    current path.
+
+    stats, callback and every are as for depth_first_solve.
+
+    @type puzzle: Puzzle
+    @type max_nodes: int
+    @type stats: SearchStats | None
+    @type callback: (SearchStats) -> bool | None
+    @type every: int
+    @rtype: PuzzleNode
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog", "cag", "bat"}
+    >>> sol = bounded_breadth_first_solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> print(sol.parent.parent.parent.puzzle)
+    From Word: cat to_word: dog
+    >>> sol = bounded_breadth_first_solve(WordLadderPuzzle("cat", "dog", \
+ws), max_nodes=2)
+    >>> print(sol.parent.parent.parent.puzzle)
+    From Word: cat to_word: dog
+    """
+    stats = _watch(stats, callback, every)
+    # keys[i] is the state key of the i-th state seen, and parents[i] the
+    # index of the state it was first reached from.
+    keys, parents = [puzzle.state_key()], array("l", [-1])
+    visited = {keys[0]}
+    q = deque([(puzzle, 0)])
+    stats.generated += 1
+    with stats.phase("search"):
+        while len(q) != 0:
+            temp, i = q.popleft()
+            if temp.fail_fast():
+                stats.pruned += 1
+                continue
+            if temp.is_solved():
+                path = []
+                while i > 0:
+                    path.append(keys[i])
+                    i = parents[i]
+                path.reverse()
+                solution = _follow(PuzzleNode(puzzle, lazy=True), path)
+                if solution is None:
+                    # The extensions did not replay; search the safe way.
+                    solution = iterative_deepening_solve(
+                        puzzle, stats=stats, callback=callback, every=every)
+                return solution
+            for ext in temp.extensions():
+                key = ext.state_key()
+                if key not in visited:
+                    visited.add(key)
+                    keys.append(key)
+                    parents.append(i)
+                    q.append((ext, len(keys) - 1))
+                    stats.generated += 1
+                else:
+                    stats.duplicates += 1
+            if not stats.expand(len(q), len(keys)):
+                return None
+            if len(keys) > max_nodes:
+                # Out of room; fall back to a search that keeps nothing but
+                # the current path.
+                del keys, parents, visited, q
+                return iterative_deepening_solve(
+                    puzzle, stats=stats, callback=callback, every=every)
+    return None
+
+
+def iter_solutions(puzzle, strategy=depth_first_solve, limit=None):
+    """
+    Generate solutions of puzzle as they are found, each as a path from
+    PuzzleNode(puzzle) to a PuzzleNode containing a solved puzzle, like
+    the one strategy returns, stopping after limit of them if given.
+
+    With depth_first_solve, each solved configuration is generated once,
+    by the first path found to it; with breadth_first_solve, every
+    shortest path to a solved configuration is generated, shortest
+    first.  The search is only carried on as far as the solutions taken
+    need.
+
+    @type puzzle: Puzzle
+    @type strategy: (Puzzle) -> PuzzleNode | None
+    @type limit: int | None
+    @rtype: generator[PuzzleNode]
+
+    >>> from sudoku_puzzle import SudokuPuzzle
+    >>> s = SudokuPuzzle(4, [["A", "B", "C", "D"], ["C", "D", "*", "*"], \
+    ["*", "*", "*", "*"], ["*", "*", "*", "*"]], {"A", "B", "C", "D"})
+    >>> len(list(iter_solutions(s)))
+    6
+    >>> len(list(iter_solutions(s, limit=1))), \
+    len(list(iter_solutions(s, limit=0)))
+    (1, 0)
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog", "cag", "dot"}
+    >>> for sol in iter_solutions(WordLadderPuzzle("cat", "dog", ws), \
+    breadth_first_solve):
+    ...     print(sol.parent.parent.puzzle, "/", sol.parent.puzzle)
+    From Word: cot to_word: dog / From Word: dot to_word: dog
+    From Word: cot to_word: dog / From Word: cog to_word: dog
+    From Word: cag to_word: dog / From Word: cog to_word: dog
+    """
+    if strategy is depth_first_solve:
+        solutions = iter_search(deque([PuzzleNode(puzzle, lazy=True)]))
+    elif strategy is breadth_first_solve:
+        solutions = _iter_shortest(puzzle)
+    else:
+        raise ValueError("iter_solutions searches with depth_first_solve "
+                         "or breadth_first_solve, not {}".format(
+                             getattr(strategy, "__name__", strategy)))
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    for solution in solutions:
+        yield solution
+        count += 1
+        if count == limit:
+            # Stop before the search goes looking for one more.
+            return
+
+
+def _iter_shortest(puzzle):
+    # Generate every shortest path from puzzle to a solved configuration,
+    # searching breadth-first one layer at a time and keeping every
+    # parent a state is reached from in the layer before it.
+    #
+    # @type puzzle: Puzzle
+    # @rtype: generator[PuzzleNode]
+    if puzzle.fail_fast():
+        return
+    # state key -> (puzzle, depth, keys of its parents one layer up)
+    seen = {puzzle.state_key(): (puzzle, 0, [])}
+    layer, depth, dead = [puzzle.state_key()], 0, set()
+    while len(layer) != 0:
+        solved = [key for key in layer if seen[key][0].is_solved()]
+        if len(solved) != 0:
+            for key in solved:
+                for path in _paths_to(key, seen):
+                    node = None
+                    for step in path:
+                        node = PuzzleNode(step, parent=node, lazy=True)
+                    yield node
+            return
+        next_layer = []
+        for key in layer:
+            for ext in seen[key][0].extensions():
+                ext_key = ext.state_key()
+                if ext_key in seen:
+                    # Another shortest way in, if it is in the next layer.
+                    if (seen[ext_key][1] == depth + 1 and
+                            key not in seen[ext_key][2]):
+                        seen[ext_key][2].append(key)
+                elif ext_key not in dead:
+                    if ext.fail_fast():
+                        dead.add(ext_key)
+                    else:
+                        seen[ext_key] = (ext, depth + 1, [key])
+                        next_layer.append(ext_key)
+        layer, depth = next_layer, depth + 1
+
+
+def _paths_to(key, seen):
+    # Generate the paths, as lists of puzzles, from the start of the search
+    # recorded in seen to the state with key, through recorded parents.
+    #
+    # @type key: Hashable
+    # @type seen: dict[Hashable, (Puzzle, int, list[Hashable])]
+    # @rtype: generator[list[Puzzle]]
+    puzzle, depth, parents = seen[key]
+    if len(parents) == 0:
+        yield [puzzle]
+    for parent in parents:
+        for path in _paths_to(parent, seen):
+            yield path + [puzzle]
+
+
+def bidirectional_solve(puzzle, stats=None, callback=None, every=1000):
+    """
+    Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
+    a solution, with each child PuzzleNode containing an extension
+    of the puzzle in its parent.  Return None if this is not possible.
+
+    Breadth-first search forward from puzzle and backward from
+    puzzle.reversed_puzzle() at the same time, one layer at a time from
+    whichever side has the smaller frontier, until the two meet.  The
+    path found is a shortest one.  Puzzles without a reversed_puzzle are
+    solved with breadth_first_solve.
+
+    stats, callback and every are as for depth_first_solve; the time
+    spent on each side is recorded as the phases "forward" and
+    "backward".
+
+    @type puzzle: Puzzle
+    @type stats: SearchStats | None
+    @type callback: (SearchStats) -> bool | None
+    @type every: int
+    @rtype: PuzzleNode
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog", "cag", "bat"}
+    >>> sol = bidirectional_solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> print(sol.puzzle)
+    From Word: dog to_word: dog
+    >>> print(sol.parent.parent.parent.puzzle)
+    From Word: cat to_word: dog
+    >>> bidirectional_solve(WordLadderPuzzle("cat", "dot", ws)) is None
+    True
+    >>> sol = bidirectional_solve(WordLadderPuzzle("cut", "dog", ws))
+    >>> print(sol.parent.puzzle)
+    From Word: cog to_word: dog
+    """
+    back = puzzle.reversed_puzzle()
+    if back is None:
+        return breadth_first_solve(puzzle, stats=stats, callback=callback,
+                                   every=every)
+    stats = _watch(stats, callback, every)
+    if puzzle.fail_fast():
+        stats.pruned += 1
+        return None
+    root = PuzzleNode(puzzle, lazy=True)
+    if puzzle.is_solved():
+        return root
+    # State keys seen on each side, mapped to their node and depth.
+    forward = {puzzle.state_key(): (root, 0)}
+    backward = {back.state_key(): (PuzzleNode(back, lazy=True), 0)}
+    stats.generated += 2
+    forward_layer, backward_layer = [root], [backward[back.state_key()][0]]
+    while len(forward_layer) != 0 and len(backward_layer) != 0:
+        # Grow the side with the smaller frontier by one layer.
+        if len(forward_layer) <= len(backward_layer):
+            with stats.phase("forward"):
+                forward_layer, meet = _expand_layer(forward_layer, forward,
+                                                    backward, stats)
+        else:
+            with stats.phase("backward"):
+                backward_layer, meet = _expand_layer(backward_layer, backward,
+                                                     forward, stats)
+        if meet is not None:
+            # Walk the backward half of the path from the meeting state.
+            keys = []
+            node = backward[meet][0].parent
+            while node is not None:
+                keys.append(node.puzzle.state_key())
+                node = node.parent
+            solution = _follow(forward[meet][0], keys)
+            if solution is None:
+                # reversed_puzzle broke its promise; search the safe way.
+                return breadth_first_solve(puzzle, stats=stats,
+                                           callback=callback, every=every)
+            return solution
+    return None
+
+
+def _expand_layer(layer, seen, other, stats):
+    # Expand every PuzzleNode in layer, recording new states in seen.
+    # Return the next layer and the key of the state seen by other that
+    # gives the shortest path through this layer, or None if there is none.
+    # If the search is stopped through stats, the next layer is empty.
+    #
+    # @type layer: list[PuzzleNode]
+    # @type seen: dict[Hashable, (PuzzleNode, int)]
+    # @type other: dict[Hashable, (PuzzleNode, int)]
+    # @type stats: SearchStats
+    # @rtype: (list[PuzzleNode], Hashable | None)
+    next_layer, meet, shortest = [], None, float("inf")
+    depth = seen[layer[0].puzzle.state_key()][1] + 1
+    for temp in layer:
+        for ext in temp.iter_children():
+            key = ext.state_key()
+            if key in seen:
+                stats.duplicates += 1
+            elif ext.fail_fast():
+                stats.pruned += 1
+            else:
+                node = PuzzleNode(ext, parent=temp, lazy=True)
+                seen[key] = (node, depth)
+                next_layer.append(node)
+                stats.generated += 1
+                if key in other and depth + other[key][1] < shortest:
+                    meet, shortest = key, depth + other[key][1]
+        if not stats.expand(len(next_layer), len(seen) + len(other)):
+            return [], None
+    return next_layer, meet
+
+
+def _follow(node, keys):
+    # Return the PuzzleNode reached from node by taking, for each key in
+    # keys in turn, the extension with that state key; None if some key
+    # is not the state of an extension.
+    #
+    # @type node: PuzzleNode
+    # @type keys: list[Hashable]
+    # @rtype: PuzzleNode | None
+    for key in keys:
+        for ext in node.iter_children():
+            if ext.state_key() == key:
+                node = PuzzleNode(ext, parent=node, lazy=True)
+                break
+        else:
+            return None
+    return node
+
+
+def astar_solve(puzzle, heuristic=None, stats=None, callback=None,
+                every=1000):
+    """
+    Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
+    a solution, with each child PuzzleNode containing an extension
+    of the puzzle in its parent.  Return None if this is not possible.
+
+    Puzzles are expanded in order of the number of extensions made so
+    far plus heuristic(puzzle), so with a heuristic that never
+    overestimates the path found is a shortest one.  The default
+    heuristic is the puzzle's own heuristic method.
+
+    stats, callback and every are as for depth_first_solve; puzzles with
+    an infinite heuristic are counted as pruned.
+
+    @type puzzle: Puzzle
+    @type heuristic: (Puzzle) -> int | float
+    @type stats: SearchStats | None
+    @type callback: (SearchStats) -> bool | None
+    @type every: int
+    @rtype: PuzzleNode
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog", "cag"}
+    >>> sol = astar_solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> print(sol.puzzle)
+    From Word: dog to_word: dog
+    >>> print(sol.parent.parent.parent.puzzle)
+    From Word: cat to_word: dog
+    """
+    stats = _watch(stats, callback, every)
+    if heuristic is None:
+        heuristic = _own_heuristic
+    h = heuristic(puzzle)
+    if h == float("inf"):
+        stats.pruned += 1
+        return None
+    # Heap entries are (f, h, count, g, node); ties on f go to the node
+    # closest to a solution, then to the one pushed first.
+    count = 0
+    heap = [(h, h, count, 0, PuzzleNode(puzzle, lazy=True))]
+    stats.generated += 1
+    # Fewest extensions found so far to reach each state.
+    best_g = {puzzle.state_key(): 0}
+    with stats.phase("search"):
+        while len(heap) != 0:
+            f, h, _, g, temp = heappop(heap)
+            # Skip entries superseded by a shorter path to the same state.
+            if g > best_g[temp.puzzle.state_key()]:
+                stats.duplicates += 1
+                continue
+            if temp.puzzle.fail_fast():
+                stats.pruned += 1
+                continue
             if temp.puzzle.is_solved():
-                # Current temp node is the solution.
                 return temp
-    # Retrun None if there is no solution to the puzzle
+            for ext in temp.iter_children():
+                key = ext.state_key()
+                if g + 1 < best_g.get(key, float("inf")):
+                    h = heuristic(ext)
+                    if h != float("inf"):
+                        best_g[key] = g + 1
+                        count += 1
+                        heappush(heap, (g + 1 + h, h, count, g + 1,
+                                        PuzzleNode(ext, parent=temp,
+                                                   lazy=True)))
+                        stats.generated += 1
+                    else:
+                        stats.pruned += 1
+                else:
+                    stats.duplicates += 1
+            if not stats.expand(len(heap), len(best_g)):
+                return None
+    return None
+
+
+def ida_star_solve(puzzle, heuristic=None, stats=None, callback=None,
+                   every=1000):
+    """
+    Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
+    a solution, with each child PuzzleNode containing an extension
+    of the puzzle in its parent.  Return None if this is not possible.
+
+    Iterative-deepening A*: repeated depth-first searches, each cut off
+    where the number of extensions plus heuristic(puzzle) exceeds a
+    bound that grows between searches.  Only the current path is kept
+    in memory.  The default heuristic is the puzzle's own heuristic
+    method; a heuristic that never overestimates gives a shortest path.
+
+    stats, callback and every are as for depth_first_solve.  The
+    frontier is the current path, there is no closed set, and each
+    search is a phase named after its bound.
+
+    @type puzzle: Puzzle
+    @type heuristic: (Puzzle) -> int | float
+    @type stats: SearchStats | None
+    @type callback: (SearchStats) -> bool | None
+    @type every: int
+    @rtype: PuzzleNode
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog", "cag"}
+    >>> sol = ida_star_solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> print(sol.parent.puzzle)
+    From Word: cog to_word: dog
+    >>> ida_star_solve(WordLadderPuzzle("cat", "dot", ws)) is None
+    True
+    """
+    stats = _watch(stats, callback, every)
+    if heuristic is None:
+        heuristic = _own_heuristic
+    bound = heuristic(puzzle)
+    root = PuzzleNode(puzzle, lazy=True)
+    stats.generated += 1
+    while bound != float("inf"):
+        with stats.phase("bound {}".format(bound)):
+            solution, bound = _ida_star_search(root, 0, bound, heuristic,
+                                               {puzzle.state_key()}, stats)
+        if solution is not None:
+            return solution
+        if stats.aborted:
+            return None
     return None
 
 
+def _ida_star_search(node, g, bound, heuristic, on_path, stats):
+    # Depth-first search below PuzzleNode node, reached with g extensions,
+    # pruning where g + heuristic exceeds bound.  Return the solved node,
+    # or None and the smallest f-value that exceeded bound.  If the search
+    # is stopped through stats, return None and inf.
+    #
+    # @type node: PuzzleNode
+    # @type g: int
+    # @type bound: int | float
+    # @type heuristic: (Puzzle) -> int | float
+    # @type on_path: set[Hashable]
+    # @type stats: SearchStats
+    # @rtype: (PuzzleNode | None, int | float)
+    f = g + heuristic(node.puzzle)
+    if f > bound:
+        return None, f
+    if node.puzzle.fail_fast():
+        stats.pruned += 1
+        return None, float("inf")
+    if node.puzzle.is_solved():
+        return node, f
+    if not stats.expand(len(on_path), 0):
+        return None, float("inf")
+    next_bound = float("inf")
+    for ext in node.iter_children():
+        key = ext.state_key()
+        # Never revisit a state already on the current path.
+        if key not in on_path:
+            on_path.add(key)
+            stats.generated += 1
+            solution, t = _ida_star_search(PuzzleNode(ext, parent=node,
+                                                      lazy=True),
+                                           g + 1, bound, heuristic, on_path,
+                                           stats)
+            on_path.remove(key)
+            if solution is not None or stats.aborted:
+                return solution, t
+            next_bound = min(next_bound, t)
+        else:
+            stats.duplicates += 1
+    return None, next_bound
+
+
+def iterative_deepening_solve(puzzle, max_depth=None, stats=None,
+                              callback=None, every=1000):
+    """
+    Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
+    a solution, with each child PuzzleNode containing an extension
+    of the puzzle in its parent.  Return None if this is not possible
+    in at most max_depth extensions, or at all when max_depth is None.
+
+    Depth-first searches limited to 0, 1, 2, ... extensions, so the path
+    found is a shortest one, as with breadth_first_solve, while only the
+    current path is kept in memory.  A state already on the current path
+    is not revisited, but one reached by another path is searched again.
+
+    stats, callback and every are as for depth_first_solve.  The
+    frontier is the current path, there is no closed set, and each
+    search is a phase named after its depth limit.
+
+    @type puzzle: Puzzle
+    @type max_depth: int | None
+    @type stats: SearchStats | None
+    @type callback: (SearchStats) -> bool | None
+    @type every: int
+    @rtype: PuzzleNode
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog", "cag", "bat"}
+    >>> sol = iterative_deepening_solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> print(sol.parent.parent.parent.puzzle)
+    From Word: cat to_word: dog
+    >>> iterative_deepening_solve(WordLadderPuzzle("cat", "dog", ws), 2) \
+is None
+    True
+    >>> iterative_deepening_solve(WordLadderPuzzle("cat", "dot", ws)) is None
+    True
+    """
+    stats = _watch(stats, callback, every)
+    root = PuzzleNode(puzzle, lazy=True)
+    stats.generated += 1
+    depth = 0
+    while max_depth is None or depth <= max_depth:
+        with stats.phase("depth {}".format(depth)):
+            solution, cut_off = _depth_limited_search(
+                root, depth, {puzzle.state_key()}, stats)
+        if solution is not None:
+            return solution
+        if not cut_off or stats.aborted:
+            # Every path ended before the limit: deeper searches would
+            # find nothing new.
+            return None
+        depth += 1
+    return None
+
+
+def _depth_limited_search(node, depth, on_path, stats):
+    # Depth-first search below PuzzleNode node for a solution at most
+    # depth extensions away.  Return the solved node, or None, and whether
+    # some path was cut off by the limit.  If the search is stopped
+    # through stats, return None and False.
+    #
+    # @type node: PuzzleNode
+    # @type depth: int
+    # @type on_path: set[Hashable]
+    # @type stats: SearchStats
+    # @rtype: (PuzzleNode | None, bool)
+    if node.puzzle.fail_fast():
+        stats.pruned += 1
+        return None, False
+    if node.puzzle.is_solved():
+        return node, False
+    if depth == 0:
+        return None, True
+    if not stats.expand(len(on_path), 0):
+        return None, False
+    cut_off = False
+    for ext in node.iter_children():
+        key = ext.state_key()
+        # Never revisit a state already on the current path.
+        if key not in on_path:
+            on_path.add(key)
+            stats.generated += 1
+            solution, cut = _depth_limited_search(
+                PuzzleNode(ext, parent=node, lazy=True), depth - 1, on_path,
+                stats)
+            on_path.remove(key)
+            if solution is not None or stats.aborted:
+                return solution, False
+            cut_off = cut_off or cut
+        else:
+            stats.duplicates += 1
+    return None, cut_off
+
+
+def _own_heuristic(puzzle):
+    # Default heuristic for astar_solve and ida_star_solve.
+    #
+    # @type puzzle: Puzzle
+    # @rtype: int | float
+    return puzzle.heuristic()
+
+
+def _watch(stats, callback, every):
+    # Return stats, or a new SearchStats if it is None, set up to pass
+    # itself to callback every `every` expansions.
+    #
+    # @type stats: SearchStats | None
+    # @type callback: (SearchStats) -> bool | None
+    # @type every: int
+    # @rtype: SearchStats
+    if stats is None:
+        stats = SearchStats()
+    stats._callback, stats._every = callback, every
+    return stats
+
+
+class SearchStats:
+    """
+    Counters and timings of a search, filled in by the solvers of this
+    module when given one.
+
+    === Attributes ===
+    @type generated: int
+        nodes put in the frontier, the first one included
+    @type expanded: int
+        nodes whose extensions were generated
+    @type duplicates: int
+        nodes and extensions dropped because their state was already seen
+    @type pruned: int
+        nodes and extensions dropped as dead ends by fail_fast
+    @type peak_frontier: int
+        most nodes waiting to be expanded at once
+    @type peak_closed: int
+        most states remembered as seen at once
+    @type phases: dict[str, float]
+        seconds spent in each phase of the search, by name
+    @type aborted: bool
+        whether the search was stopped by its callback
+
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> ws = {"cat", "cot", "cog", "dog", "cag"}
+    >>> stats = SearchStats()
+    >>> sol = breadth_first_solve(WordLadderPuzzle("cat", "dog", ws), \
+    stats=stats)
+    >>> stats.generated, stats.expanded, stats.duplicates, stats.pruned
+    (6, 4, 9, 0)
+    >>> stats.peak_frontier, stats.peak_closed, list(stats.phases)
+    (2, 4, ['search'])
+    >>> breadth_first_solve(WordLadderPuzzle("cat", "dog", ws), \
+    callback=lambda s: s.expanded < 2, every=1) is None
+    True
+    """
+
+    def __init__(self):
+        """
+        Create a new SearchStats self with everything at zero.
+
+        @type self: SearchStats
+        @rtype: None
+        """
+        self.generated, self.expanded = 0, 0
+        self.duplicates, self.pruned = 0, 0
+        self.peak_frontier, self.peak_closed = 0, 0
+        self.phases, self.aborted = {}, False
+        self._callback, self._every = None, 1
+
+    def __str__(self):
+        """
+        Return a human-readable summary of SearchStats self.
+
+        @type self: SearchStats
+        @rtype: str
+
+        >>> print(SearchStats())
+        generated 0, expanded 0, duplicates 0, pruned 0, peak frontier 0, \
+peak closed 0
+        """
+        lines = ["generated {}, expanded {}, duplicates {}, pruned {}, "
+                 "peak frontier {}, peak closed {}".format(
+                     self.generated, self.expanded, self.duplicates,
+                     self.pruned, self.peak_frontier, self.peak_closed)]
+        for name in self.phases:
+            lines.append("{}: {:.3f} seconds".format(name, self.phases[name]))
+        if self.aborted:
+            lines.append("aborted")
+        return "\n".join(lines)
+
+    def expand(self, frontier, closed):
+        """
+        Count an expansion, after which frontier nodes are waiting and
+        closed states have been seen.  Return False if the search should
+        stop because the callback said so.
+
+        @type self: SearchStats
+        @type frontier: int
+        @type closed: int
+        @rtype: bool
+        """
+        self.expanded += 1
+        if frontier > self.peak_frontier:
+            self.peak_frontier = frontier
+        if closed > self.peak_closed:
+            self.peak_closed = closed
+        if (self._callback is not None and
+                self.expanded % self._every == 0 and
+                self._callback(self) is False):
+            self.aborted = True
+        return not self.aborted
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Return a context manager adding the time spent in it to the phase
+        called name.
+
+        @type self: SearchStats
+        @type name: str
+        @rtype: contextmanager
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (self.phases.get(name, 0) +
+                                 perf_counter() - start)
+
+
 # Class PuzzleNode helps build trees of PuzzleNodes that have
 # an arbitrary number of children, and a parent.
 class PuzzleNode:
@@ -112,21 +891,70 @@ class PuzzleNode:
     can be extended to.
     """
 
-    def __init__(self, puzzle=None, children=None, parent=None):
+    def __init__(self, puzzle=None, children=None, parent=None, lazy=False):
         """
         Create a new puzzle node self with configuration puzzle.
 
+        If lazy is True and no children are given, the children of self
+        are the extensions of puzzle, generated only when they are first
+        needed.
+
         @type self: PuzzleNode
         @type puzzle: Puzzle | None
         @type children: list[PuzzleNode]
         @type parent: PuzzleNode | None
+        @type lazy: bool
         @rtype: None
         """
         self.puzzle, self.parent = puzzle, parent
-        if children is None:
-            self.children = []
+        if children is not None:
+            self._children = children[:]
+        elif lazy and puzzle is not None:
+            # Filled in from puzzle.extensions() on first access.
+            self._children = None
+        else:
+            self._children = []
+
+    @property
+    def children(self):
+        """
+        The children of PuzzleNode self.
+
+        >>> from word_ladder_puzzle import WordLadderPuzzle
+        >>> pn = PuzzleNode(WordLadderPuzzle("on", "no", {"on", "oo"}),
+        ...                 lazy=True)
+        >>> [str(x) for x in pn.children]
+        ['From Word: on to_word: no', 'From Word: oo to_word: no']
+
+        @type self: PuzzleNode
+        @rtype: list
+        """
+        if self._children is None:
+            self._children = list(self.puzzle.extensions())
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+
+    def iter_children(self):
+        """
+        Return a generator over the children of PuzzleNode self.
+
+        The children of a lazy node that have not been needed yet are
+        generated one at a time from its puzzle's extensions and are not
+        stored in self, so a solver expanding the node pays for the
+        extensions only once.
+
+        @type self: PuzzleNode
+        @rtype: generator
+        """
+        if self._children is None:
+            for ext in self.puzzle.extensions():
+                yield ext
         else:
-            self.children = children[:]
+            for child in self._children:
+                yield child
 
     def __eq__(self, other):
         """
@@ -137,9 +965,10 @@ class PuzzleNode:
         @rtype: bool
 
         >>> from word_ladder_puzzle import WordLadderPuzzle
-        >>> pn1 = PuzzleNode(WordLadderPuzzle("on", "no", {"on", "no", "oo"}))
-        >>> pn2 = PuzzleNode(WordLadderPuzzle("on", "no", {"on", "oo", "no"}))
-        >>> pn3 = PuzzleNode(WordLadderPuzzle("no", "on", {"on", "no", "oo"}))
+        >>> ws = {"on", "no", "oo"}
+        >>> pn1 = PuzzleNode(WordLadderPuzzle("on", "no", ws))
+        >>> pn2 = PuzzleNode(WordLadderPuzzle("on", "no", ws))
+        >>> pn3 = PuzzleNode(WordLadderPuzzle("no", "on", ws))
         >>> pn1.__eq__(pn2)
         True
         >>> pn1.__eq__(pn3)
@@ -0,0 +1,271 @@
+"""
+A cache of solutions in front of the solvers, in memory and on disk.
+
+Solutions are looked up by the name of the strategy and the repr of the
+puzzle, which is the same for equal puzzles of every kind in this
+repository.  A word ladder's dictionary appears in its repr as a
+fingerprint of its words, and is not saved with its solutions: a cached
+path is given the dictionary of the puzzle being looked up.
+"""
+from collections import OrderedDict
+from parallel_tools import _dumps, _loads, _node_to_path, _path_to_node
+from puzzle_tools import depth_first_solve
+from word_index import WordIndex
+import sqlite3
+
+
+class SolutionCache:
+    """
+    Solutions found by the solvers, kept in a least recently used table
+    of memory_size paths, and in an sqlite database at path, if given,
+    of at most disk_size bytes of pickled paths.
+
+    >>> from word_index import load_words
+    >>> from word_ladder_puzzle import WordLadderPuzzle
+    >>> cache = SolutionCache()
+    >>> ws = {"cat", "cot", "cog", "dog"}
+    >>> sol = cache.solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> cache.solve(WordLadderPuzzle("cat", "dog", ws)) is sol
+    False
+    >>> other = WordLadderPuzzle("cat", "dog", set(ws))
+    >>> sol = cache.solve(other)
+    >>> print(sol.parent.puzzle)
+    From Word: cog to_word: dog
+    >>> sol.parent.parent.parent.puzzle == other
+    True
+    >>> cache.hits, cache.misses
+    (2, 1)
+    >>> import os, tempfile
+    >>> words = os.path.join(tempfile.mkdtemp(), "words")
+    >>> with open(words, "w") as f:
+    ...     _ = f.write("cat cot cog dog\\n")
+    >>> ws = load_words(words)
+    >>> sol = cache.solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> sol = cache.solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> sol.puzzle._word_set is ws
+    True
+    >>> sol = cache.solve(WordLadderPuzzle("cat", "dog", WordIndex(ws)))
+    >>> cache.hits, cache.misses
+    (5, 1)
+    """
+
+    def __init__(self, path=None, memory_size=1024, disk_size=64 * 2 ** 20):
+        """
+        Create a new SolutionCache self, saving to the sqlite database at
+        path if it is not None.
+
+        @type self: SolutionCache
+        @type path: str | None
+        @type memory_size: int
+        @type disk_size: int
+        @rtype: None
+        """
+        self.memory_size, self.disk_size = memory_size, disk_size
+        self.hits, self.misses = 0, 0
+        # key -> the puzzles from the start to the solution, pickled by
+        # _dumps, or None
+        self._memory = OrderedDict()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS solutions ("
+                             "key TEXT PRIMARY KEY, path BLOB, "
+                             "size INTEGER, used INTEGER)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS solutions_used "
+                             "ON solutions (used)")
+            # Uses so far, to order the rows by when they were last used.
+            self._clock = self._db.execute(
+                "SELECT COALESCE(MAX(used), 0) FROM solutions").fetchone()[0]
+
+    def solve(self, puzzle, strategy=depth_first_solve):
+        """
+        Return what strategy returns for puzzle, from the cache if it was
+        solved with strategy before.
+
+        strategy must give the same solution every time for equal
+        puzzles, as the solvers in puzzle_tools do.
+
+        @type self: SolutionCache
+        @type puzzle: Puzzle
+        @type strategy: (Puzzle) -> PuzzleNode | None
+        @rtype: PuzzleNode | None
+
+        >>> import os, tempfile
+        >>> from mn_puzzle import MNPuzzle
+        >>> path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+        >>> target_grid = (("1", "2", "3"), ("4", "5", "*"))
+        >>> start_grid = (("*", "2", "3"), ("1", "4", "5"))
+        >>> SolutionCache(path).solve(MNPuzzle(start_grid, target_grid)) \
+        is None
+        False
+        >>> cache = SolutionCache(path)
+        >>> sol = cache.solve(MNPuzzle(start_grid, target_grid))
+        >>> sol.puzzle.is_solved(), cache.hits
+        (True, 1)
+        >>> cache.close()
+        """
+        key = "{}.{}\n{!r}".format(strategy.__module__, strategy.__name__,
+                                   puzzle)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            data = self._memory[key]
+        else:
+            row = None
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT path FROM solutions WHERE key = ?",
+                    (key,)).fetchone()
+            if row is not None:
+                self.hits += 1
+                data = row[0]
+                self._clock += 1
+                with self._db:
+                    self._db.execute(
+                        "UPDATE solutions SET used = ? WHERE key = ?",
+                        (self._clock, key))
+            else:
+                self.misses += 1
+                path, data = _node_to_path(strategy(puzzle)), None
+                if path is not None:
+                    data = _dumps(path, [], _names(puzzle))
+                if self._db is not None:
+                    self._save(key, data)
+            self._remember(key, data)
+        if data is None:
+            return None
+        return _path_to_node(_loads(data, _Attributes(puzzle)))
+
+    def close(self):
+        """
+        Close the database of SolutionCache self, if it has one.
+
+        @type self: SolutionCache
+        @rtype: None
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key, data):
+        # Keep the pickled path data under key in memory, forgetting the
+        # least recently used path if there are too many.
+        #
+        # @type self: SolutionCache
+        # @type key: str
+        # @type data: bytes | None
+        # @rtype: None
+        self._memory[key] = data
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _save(self, key, data):
+        # Save the pickled path data under key in the database, deleting the
+        # least recently used rows while the total is over disk_size bytes.
+        #
+        # @type self: SolutionCache
+        # @type key: str
+        # @type data: bytes | None
+        # @rtype: None
+        size = len(key) + (0 if data is None else len(data))
+        self._clock += 1
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO solutions "
+                             "VALUES (?, ?, ?, ?)",
+                             (key, data, size, self._clock))
+            total = self._db.execute(
+                "SELECT SUM(size) FROM solutions").fetchone()[0]
+            while total > self.disk_size:
+                oldest = self._db.execute(
+                    "SELECT key, size FROM solutions ORDER BY used "
+                    "LIMIT 1").fetchone()
+                self._db.execute("DELETE FROM solutions WHERE key = ?",
+                                 (oldest[0],))
+                total -= oldest[1]
+
+
+def _names(puzzle):
+    # Return a dict mapping the id of each set and word index puzzle refers
+    # to, which are left out when a path is pickled, to the names of the
+    # attributes of puzzle referring to it.
+    #
+    # @type puzzle: Puzzle
+    # @rtype: dict[int, tuple[str]]
+    ids = {}
+    attributes = getattr(puzzle, "__dict__", {})
+    for name in sorted(attributes):
+        value = attributes[name]
+        if isinstance(value, (set, frozenset, WordIndex)):
+            ids[id(value)] = ids.get(id(value), ()) + (name,)
+    return ids
+
+
+class _Attributes:
+    """
+    The sets and word indexes of the puzzle being looked up, by the names
+    of the attributes that referred to them when a path was pickled.
+    """
+
+    def __init__(self, puzzle):
+        """
+        Create a new _Attributes self of puzzle.
+
+        @type self: _Attributes
+        @type puzzle: Puzzle
+        @rtype: None
+        """
+        self._puzzle = puzzle
+
+    def __getitem__(self, names):
+        """
+        Return the first of the attributes names of the puzzle of
+        _Attributes self that is set, as an attribute holding a cached
+        index, like WordLadderPuzzle._index, may not be yet.
+
+        @type self: _Attributes
+        @type names: tuple[str]
+        @rtype: set | frozenset | WordIndex
+        """
+        for name in names:
+            value = getattr(self._puzzle, name, None)
+            if value is not None:
+                return value
+        raise KeyError(names)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
+    import os
+    import tempfile
+    from time import perf_counter
+    from sudoku_puzzle import SudokuPuzzle
+    from word_index import load_words
+    from word_ladder_puzzle import WordLadderPuzzle
+
+    s = SudokuPuzzle(9,
+                     [["*", "*", "*", "7", "*", "8", "*", "1", "*"],
+                      ["*", "*", "7", "*", "9", "*", "*", "*", "6"],
+                      ["9", "*", "3", "1", "*", "*", "*", "*", "*"],
+                      ["3", "5", "*", "8", "*", "*", "6", "*", "1"],
+                      ["*", "*", "*", "*", "*", "*", "*", "*", "*"],
+                      ["1", "*", "6", "*", "*", "9", "*", "4", "8"],
+                      ["*", "*", "*", "*", "*", "1", "2", "*", "7"],
+                      ["8", "*", "*", "*", "7", "*", "4", "*", "*"],
+                      ["*", "6", "*", "3", "*", "2", "*", "*", "*"]],
+                     {"1", "2", "3", "4", "5", "6", "7", "8", "9"})
+    w = WordLadderPuzzle("same", "cost", load_words("words"))
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    for name, puzzle in (("sudoku", s), ("word ladder", w)):
+        times = []
+        for cache in (SolutionCache(path), SolutionCache(path),
+                      SolutionCache(path)):
+            for _ in range(2):
+                start = perf_counter()
+                cache.solve(puzzle)
+                times.append(perf_counter() - start)
+            cache.close()
+        print("{}: solved in {:.6f} seconds, then from memory in {:.6f}, "
+              "from disk in {:.6f}".format(name, times[0], times[1],
+                                           times[2]))
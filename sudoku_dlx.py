@@ -0,0 +1,298 @@
+"""
+Exact-cover (Dancing Links) backend for SudokuPuzzle.
+
+A sudoku grid is solved when every position, and every symbol in every
+row, column and subsquare, is covered exactly once by the chosen
+(row, column, symbol) assignments.  Knuth's Algorithm X searches for
+such exact covers, with the matrix kept as circular doubly-linked lists
+so that covering and uncovering a column are O(1) per node.
+"""
+from puzzle_tools import PuzzleNode
+from sudoku_puzzle import SudokuPuzzle
+
+
+def dlx_solve(puzzle):
+    """
+    Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
+    a solution, with each child PuzzleNode containing an extension
+    of the puzzle in its parent, filling one open position.  Return None
+    if this is not possible.
+
+    @type puzzle: SudokuPuzzle
+    @rtype: PuzzleNode
+
+    >>> s = SudokuPuzzle(4, [["A", "B", "C", "D"], ["C", "D", "A", "B"], \
+    ["B", "*", "D", "*"], ["*", "*", "*", "A"]], {"A", "B", "C", "D"})
+    >>> sol = dlx_solve(s)
+    >>> print(sol.puzzle)
+    AB|CD
+    CD|AB
+    -----
+    BA|DC
+    DC|BA
+    >>> sol.puzzle.is_solved()
+    True
+    >>> sol.parent.parent.parent.parent.parent.puzzle == s
+    True
+    """
+    for solution in _solutions(puzzle):
+        node = PuzzleNode(puzzle)
+        symbols = [row[:] for row in puzzle._symbols]
+        for r, c, symbol in sorted(solution):
+            if symbols[r][c] == "*":
+                symbols[r][c] = symbol
+                node = PuzzleNode(SudokuPuzzle(puzzle._n,
+                                               [row[:] for row in symbols],
+                                               puzzle._symbol_set),
+                                  parent=node)
+        return node
+    return None
+
+
+def count_solutions(puzzle, limit=2):
+    """
+    Return the number of solutions of puzzle, counting no further
+    than limit.
+
+    With the default limit, 1 means the solution is unique.
+
+    @type puzzle: SudokuPuzzle
+    @type limit: int | None
+    @rtype: int
+
+    >>> s = SudokuPuzzle(4, [["A", "B", "C", "D"], ["C", "D", "*", "*"], \
+    ["*", "*", "*", "*"], ["*", "*", "*", "*"]], {"A", "B", "C", "D"})
+    >>> count_solutions(s)
+    2
+    >>> s = SudokuPuzzle(4, [["A", "B", "C", "D"], ["C", "D", "A", "B"], \
+    ["B", "*", "*", "*"], ["*", "*", "*", "A"]], {"A", "B", "C", "D"})
+    >>> count_solutions(s)
+    1
+    >>> s = SudokuPuzzle(4, [["A", "B", "C", "D"], ["*", "*", "*", "*"], \
+    ["*", "*", "*", "*"], ["*", "*", "*", "*"]], {"A", "B", "C", "D"})
+    >>> count_solutions(s, None), count_solutions(s, 0)
+    (12, 0)
+    """
+    if limit is not None and limit <= 0:
+        return 0
+    count = 0
+    for _ in _solutions(puzzle):
+        count += 1
+        if count == limit:
+            break
+    return count
+
+
+def has_unique_solution(puzzle):
+    """
+    Return whether puzzle has exactly one solution.
+
+    @type puzzle: SudokuPuzzle
+    @rtype: bool
+    """
+    return count_solutions(puzzle, 2) == 1
+
+
+def _solutions(puzzle):
+    # Generate the solutions of puzzle, each as a list of
+    # (row, column, symbol) assignments covering the whole grid.
+    #
+    # @type puzzle: SudokuPuzzle
+    # @rtype: generator[list[(int, int, str)]]
+    n, symbols = puzzle._n, puzzle._symbols
+    ss = round(n ** (1 / 2))
+    order = sorted(puzzle._symbol_set)
+    # Symbols given in each row, column and subsquare; only assignments
+    # consistent with them are put in the matrix.
+    given = set()
+    for r in range(n):
+        for c in range(n):
+            if symbols[r][c] != "*":
+                box = (r // ss) * ss + c // ss
+                given.update([("r", r, symbols[r][c]), ("c", c, symbols[r][c]),
+                              ("b", box, symbols[r][c])])
+    matrix = _DancingLinks(4 * n * n)
+    for r in range(n):
+        for c in range(n):
+            box = (r // ss) * ss + c // ss
+            if symbols[r][c] == "*":
+                choices = [s for s in order
+                           if ("r", r, s) not in given and
+                           ("c", c, s) not in given and
+                           ("b", box, s) not in given]
+            else:
+                choices = [symbols[r][c]]
+            for symbol in choices:
+                s = order.index(symbol)
+                # Columns: the position, and the symbol in its row, column
+                # and subsquare.
+                matrix.add_row((r, c, symbol),
+                               [r * n + c, n * n + r * n + s,
+                                2 * n * n + c * n + s,
+                                3 * n * n + box * n + s])
+    return matrix.exact_covers()
+
+
+class _DancingLinks:
+    """
+    A sparse 0-1 matrix for Algorithm X, as circular doubly-linked lists
+    of its 1s stored in parallel arrays.  Node 0 is the root, nodes 1 to
+    the number of columns are the column headers.
+    """
+
+    def __init__(self, columns):
+        """
+        Create an empty matrix with columns columns.
+
+        @type self: _DancingLinks
+        @type columns: int
+        @rtype: None
+        """
+        headers = range(columns + 1)
+        self._left = [i - 1 for i in headers]
+        self._left[0] = columns
+        self._right = [i + 1 for i in headers]
+        self._right[columns] = 0
+        self._up, self._down = list(headers), list(headers)
+        self._column, self._size = list(headers), [0] * (columns + 1)
+        # Row label of each node.
+        self._row = [None] * (columns + 1)
+
+    def add_row(self, label, columns):
+        """
+        Add a row labelled label with 1s in columns, numbered from 0.
+
+        @type self: _DancingLinks
+        @type label: object
+        @type columns: list[int]
+        @rtype: None
+        """
+        first = None
+        for column in columns:
+            header, node = column + 1, len(self._left)
+            # Link into the bottom of the column.
+            self._up.append(self._up[header])
+            self._down.append(header)
+            self._down[self._up[header]] = node
+            self._up[header] = node
+            self._column.append(header)
+            self._size[header] += 1
+            self._row.append(label)
+            # Link into the end of the row.
+            if first is None:
+                first = node
+                self._left.append(node)
+                self._right.append(node)
+            else:
+                self._left.append(self._left[first])
+                self._right.append(first)
+                self._right[self._left[first]] = node
+                self._left[first] = node
+
+    def exact_covers(self):
+        """
+        Generate the labels of the rows of each exact cover of the matrix.
+
+        @type self: _DancingLinks
+        @rtype: generator[list[object]]
+        """
+        return self._search([])
+
+    def _search(self, chosen):
+        # Generate the exact covers extending the rows in chosen.
+        #
+        # @type self: _DancingLinks
+        # @type chosen: list[object]
+        # @rtype: generator[list[object]]
+        right, down, size = self._right, self._down, self._size
+        if right[0] == 0:
+            yield chosen[:]
+            return
+        # Column with the fewest 1s left.
+        column, j = right[0], right[right[0]]
+        while j != 0:
+            if size[j] < size[column]:
+                column = j
+            j = right[j]
+        if size[column] == 0:
+            return
+        self._cover(column)
+        i = down[column]
+        while i != column:
+            chosen.append(self._row[i])
+            j = right[i]
+            while j != i:
+                self._cover(self._column[j])
+                j = right[j]
+            for cover in self._search(chosen):
+                yield cover
+            j = self._left[i]
+            while j != i:
+                self._uncover(self._column[j])
+                j = self._left[j]
+            chosen.pop()
+            i = down[i]
+        self._uncover(column)
+
+    def _cover(self, column):
+        # Remove column and every row with a 1 in it.
+        #
+        # @type self: _DancingLinks
+        # @type column: int
+        # @rtype: None
+        left, right, up, down = self._left, self._right, self._up, self._down
+        right[left[column]], left[right[column]] = right[column], left[column]
+        i = down[column]
+        while i != column:
+            j = right[i]
+            while j != i:
+                down[up[j]], up[down[j]] = down[j], up[j]
+                self._size[self._column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, column):
+        # Undo _cover(column).
+        #
+        # @type self: _DancingLinks
+        # @type column: int
+        # @rtype: None
+        left, right, up, down = self._left, self._right, self._up, self._down
+        i = up[column]
+        while i != column:
+            j = left[i]
+            while j != i:
+                self._size[self._column[j]] += 1
+                down[up[j]], up[down[j]] = j, j
+                j = left[j]
+            i = up[i]
+        right[left[column]], left[right[column]] = column, column
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
+    from time import time
+
+    s = SudokuPuzzle(9,
+                     [["*", "*", "*", "7", "*", "8", "*", "1", "*"],
+                      ["*", "*", "7", "*", "9", "*", "*", "*", "6"],
+                      ["9", "*", "3", "1", "*", "*", "*", "*", "*"],
+                      ["3", "5", "*", "8", "*", "*", "6", "*", "1"],
+                      ["*", "*", "*", "*", "*", "*", "*", "*", "*"],
+                      ["1", "*", "6", "*", "*", "9", "*", "4", "8"],
+                      ["*", "*", "*", "*", "*", "1", "2", "*", "7"],
+                      ["8", "*", "*", "*", "7", "*", "4", "*", "*"],
+                      ["*", "6", "*", "3", "*", "2", "*", "*", "*"]],
+                     {"1", "2", "3", "4", "5", "6", "7", "8", "9"})
+    start = time()
+    sol = dlx_solve(s)
+    end = time()
+    print("time to solve 9x9 using dancing links: {} seconds\n".format(
+        end - start))
+    print(sol.puzzle)
+    start = time()
+    unique = has_unique_solution(s)
+    end = time()
+    print("unique: {} (checked in {} seconds)".format(unique, end - start))
@@ -59,6 +59,82 @@ class SudokuPuzzle(Puzzle):
                 self._n == other._n and self._symbols == other._symbols and
                 self._symbol_set == other._symbol_set)
 
+    def __hash__(self):
+        """
+        Return a hash of SudokuPuzzle self consistent with __eq__.
+
+        @type self: SudokuPuzzle
+        @rtype: int
+        """
+        return hash(self.state_key())
+
+    def state_key(self):
+        """
+        Return the grid of SudokuPuzzle self as a tuple of row tuples.
+
+        @type self: SudokuPuzzle
+        @rtype: tuple[tuple[str]]
+
+        >>> r1 = ["A", "B", "C", "D"]
+        >>> r2 = ["D", "C", "B", "A"]
+        >>> r3 = ["*", "D", "*", "*"]
+        >>> r4 = ["*", "*", "*", "*"]
+        >>> s = SudokuPuzzle(4, [r1, r2, r3, r4], {"A", "B", "C", "D"})
+        >>> s.state_key()[2]
+        ('*', 'D', '*', '*')
+        """
+        return tuple(tuple(row) for row in self._symbols)
+
+    def canonical_key(self):
+        """
+        Return a key shared by SudokuPuzzle self and every grid obtained
+        from it by rotating, reflecting or renaming its symbols.
+
+        For each rotation and reflection the symbols are renamed 1, 2, ...
+        in order of first appearance, reading row by row, with "*" as 0;
+        the smallest result is the key.
+
+        Every grid searched from a starting grid keeps its givens, so two
+        of them can only be symmetric copies of each other if each holds
+        both the givens and an image of them, which rarely happens unless
+        the givens are symmetric themselves.  On typical puzzles a search
+        with symmetry prunes nothing, while each key costs eight relabelled
+        grids, about twice the time of the plain search; it only pays off
+        from an empty or symmetric starting grid.
+
+        @type self: SudokuPuzzle
+        @rtype: tuple[int]
+
+        >>> r1 = ["A", "B", "*", "*"]
+        >>> r2 = ["*", "*", "*", "*"]
+        >>> s1 = SudokuPuzzle(4, [r1, r2, r2, r2], {"A", "B", "C", "D"})
+        >>> r3 = ["*", "*", "*", "C"]
+        >>> r4 = ["*", "*", "*", "D"]
+        >>> s2 = SudokuPuzzle(4, [r2, r2, r3, r4], {"A", "B", "C", "D"})
+        >>> s1.canonical_key() == s2.canonical_key()
+        True
+        >>> s1.canonical_key() == SudokuPuzzle(4, [r4, r2, r2, r3],
+        ...                                    {"A", "B", "C", "D"}).canonical_key()
+        False
+        """
+        rows = self._symbols
+        columns = [list(column) for column in zip(*rows)]
+        grids = []
+        for grid in (rows, columns):
+            grids.extend([grid, grid[::-1], [row[::-1] for row in grid],
+                          [row[::-1] for row in grid[::-1]]])
+        keys = []
+        for grid in grids:
+            names = {"*": 0}
+            key = []
+            for row in grid:
+                for symbol in row:
+                    if symbol not in names:
+                        names[symbol] = len(names)
+                    key.append(names[symbol])
+            keys.append(tuple(key))
+        return min(keys)
+
     def __str__(self):
         """
         Return a human-readable string representation of SudokuPuzzle self.
@@ -102,6 +178,22 @@ class SudokuPuzzle(Puzzle):
             s += "\n"
         return s.rstrip()
 
+    def __repr__(self):
+        """
+        Return a string representation of SudokuPuzzle self, the same for
+        every equal puzzle.
+
+        @type self: SudokuPuzzle
+        @rtype: str
+
+        >>> SudokuPuzzle(4, [["A", "B", "C", "D"], ["*", "*", "*", "*"], \
+        ["*", "*", "*", "*"], ["*", "*", "*", "*"]], {"D", "C", "B", "A"})
+        SudokuPuzzle(4, ['ABCD', '****', '****', '****'], ['A', 'B', 'C', 'D'])
+        """
+        return "{}({}, {!r}, {!r})".format(
+            type(self).__name__, self._n,
+            ["".join(row) for row in self._symbols], sorted(self._symbol_set))
+
     def is_solved(self):
         """
         Return whether SudokuPuzzle self is solved.
@@ -283,6 +375,254 @@ class SudokuPuzzle(Puzzle):
         return set(subsquare_symbols)
 
 
+class ConstraintSudokuPuzzle(SudokuPuzzle):
+    """
+    A sudoku puzzle that fills in every forced position as it goes.
+
+    The symbols already used in each row, column and subsquare are kept
+    as bitmasks, updated as each position is filled, so the symbols
+    allowed at a position take a few bit operations to find.  After
+    each assignment, positions with one allowed symbol left (naked
+    singles) and symbols with one allowed position left in a row,
+    column or subsquare (hidden singles) are filled in until nothing
+    more is forced.  Extensions branch on the open position with the
+    fewest allowed symbols.
+    """
+
+    def __init__(self, n, symbols, symbol_set):
+        """
+        Create a new nxn ConstraintSudokuPuzzle self with symbols
+        from symbol_set already selected, and the positions they force
+        filled in.
+
+        @type self: ConstraintSudokuPuzzle
+        @type n: int
+        @type symbols: list[list of str]
+        @type symbol_set: set[str]
+
+        >>> s = ConstraintSudokuPuzzle(4, [["A", "B", "C", "*"], \
+        ["*", "*", "*", "*"], ["*", "*", "*", "*"], ["*", "*", "*", "B"]], \
+        {"A", "B", "C", "D"})
+        >>> print(s)
+        AB|CD
+        **|BA
+        -----
+        B*|*C
+        **|*B
+        """
+        # Copy the rows, which are filled in place as symbols are forced.
+        SudokuPuzzle.__init__(self, n, [row[:] for row in symbols],
+                              symbol_set)
+        # Bit for each symbol, and symbol for each bit.
+        self._bit = {}
+        self._symbol_of = {}
+        for i, symbol in enumerate(sorted(symbol_set)):
+            self._bit[symbol], self._symbol_of[1 << i] = 1 << i, symbol
+        # Symbols used in each row, column and subsquare.
+        self._rows, self._columns, self._subsquares = [0] * n, [0] * n, [0] * n
+        self._dead = False
+        for r in range(n):
+            for c in range(n):
+                if self._symbols[r][c] != "*":
+                    self._place(r, c, self._bit[self._symbols[r][c]])
+        self._propagate()
+
+    def _copy(self):
+        # Return a copy of ConstraintSudokuPuzzle self that can be filled
+        # in without changing self.
+        #
+        # @type self: ConstraintSudokuPuzzle
+        # @rtype: ConstraintSudokuPuzzle
+        other = ConstraintSudokuPuzzle.__new__(ConstraintSudokuPuzzle)
+        other._n, other._symbol_set = self._n, self._symbol_set
+        other._bit, other._symbol_of = self._bit, self._symbol_of
+        other._symbols = [row[:] for row in self._symbols]
+        other._rows, other._columns = self._rows[:], self._columns[:]
+        other._subsquares = self._subsquares[:]
+        other._dead = self._dead
+        return other
+
+    def is_solved(self):
+        """
+        Return whether ConstraintSudokuPuzzle self is solved.
+
+        Every symbol placed was checked against its row, column and
+        subsquare, so self is solved once no position is open.
+
+        @type self: ConstraintSudokuPuzzle
+        @rtype: bool
+
+        >>> s = ConstraintSudokuPuzzle(4, [["A", "B", "C", "*"], \
+        ["C", "D", "A", "B"], ["B", "A", "D", "C"], ["D", "C", "B", "*"]], \
+        {"A", "B", "C", "D"})
+        >>> s.is_solved()
+        True
+        """
+        return not self._dead and not any("*" in row for row in self._symbols)
+
+    def fail_fast(self):
+        """
+        Return whether filling in forced positions showed that
+        ConstraintSudokuPuzzle self can never be completed.
+
+        @type self: ConstraintSudokuPuzzle
+        @rtype: bool
+
+        >>> s = ConstraintSudokuPuzzle(4, \
+        [["B", "D", "A", "C"], \
+        ["C", "A", "B", "D"], \
+        ["A", "B", "*", "*"], \
+        ["*", "*", "*", "*"]], {"A", "B", "C", "D"})
+        >>> s.fail_fast()
+        True
+        """
+        return self._dead
+
+    def extensions(self):
+        """
+        Return list of extensions of ConstraintSudokuPuzzle self: one for
+        each symbol allowed at the open position with the fewest allowed
+        symbols, with the positions it forces filled in.  Extensions found
+        to be impossible while filling in are left out.
+
+        @type self: ConstraintSudokuPuzzle
+        @rtype: list[ConstraintSudokuPuzzle]
+
+        >>> s = ConstraintSudokuPuzzle(4, [["*", "*", "*", "*"], \
+        ["*", "*", "*", "*"], ["*", "*", "*", "*"], ["*", "*", "*", "*"]], \
+        {"A", "B", "C", "D"})
+        >>> [x._symbols[0][0] for x in s.extensions()]
+        ['A', 'B', 'C', 'D']
+        """
+        if self._dead:
+            return []
+        # Open position with the fewest allowed symbols.
+        best, fewest = None, self._n + 1
+        for r in range(self._n):
+            for c in range(self._n):
+                if self._symbols[r][c] == "*":
+                    allowed = self._allowed(r, c)
+                    count = bin(allowed).count("1")
+                    if count < fewest:
+                        best, fewest = (r, c, allowed), count
+        if best is None:
+            return []
+        r, c, allowed = best
+        return_lst = []
+        while allowed:
+            # Lowest remaining bit, i.e. symbols in sorted order.
+            bit = allowed & -allowed
+            allowed ^= bit
+            new_puzzle = self._copy()
+            new_puzzle._place(r, c, bit)
+            new_puzzle._propagate()
+            if not new_puzzle._dead:
+                return_lst.append(new_puzzle)
+        return return_lst
+
+    def _allowed(self, r, c):
+        # Return the bitmask of symbols allowed at row r, column c.
+        #
+        # @type self: ConstraintSudokuPuzzle
+        # @type r: int
+        # @type c: int
+        # @rtype: int
+        ss = round(self._n ** (1 / 2))
+        return ((1 << self._n) - 1) & ~(self._rows[r] | self._columns[c] |
+                                        self._subsquares[(r // ss) * ss +
+                                                         c // ss])
+
+    def _place(self, r, c, bit):
+        # Put the symbol for bit at row r, column c, noting that self is
+        # dead if its row, column or subsquare already has it.
+        #
+        # @type self: ConstraintSudokuPuzzle
+        # @type r: int
+        # @type c: int
+        # @type bit: int
+        # @rtype: None
+        ss = round(self._n ** (1 / 2))
+        s = (r // ss) * ss + c // ss
+        if (self._rows[r] | self._columns[c] | self._subsquares[s]) & bit:
+            self._dead = True
+        self._symbols[r][c] = self._symbol_of[bit]
+        self._rows[r] |= bit
+        self._columns[c] |= bit
+        self._subsquares[s] |= bit
+
+    def _propagate(self):
+        # Fill in naked and hidden singles until none are left, or self
+        # is found to be dead.
+        #
+        # @type self: ConstraintSudokuPuzzle
+        # @rtype: None
+        n, symbols, full = self._n, self._symbols, (1 << self._n) - 1
+        progress = True
+        while progress and not self._dead:
+            progress = False
+            # Naked singles: one symbol allowed at a position.
+            for r in range(n):
+                for c in range(n):
+                    if symbols[r][c] == "*":
+                        allowed = self._allowed(r, c)
+                        if allowed == 0:
+                            self._dead = True
+                            return
+                        if allowed & (allowed - 1) == 0:
+                            self._place(r, c, allowed)
+                            progress = True
+            if progress:
+                continue
+            # Hidden singles: one position allowed for a symbol in a unit.
+            for unit in _units(n):
+                used, once, twice = 0, 0, 0
+                for r, c in unit:
+                    if symbols[r][c] == "*":
+                        allowed = self._allowed(r, c)
+                        twice |= once & allowed
+                        once |= allowed
+                    else:
+                        used |= self._bit[symbols[r][c]]
+                if full & ~(used | once):
+                    # Some symbol fits nowhere in this unit.
+                    self._dead = True
+                    return
+                singles = once & ~twice
+                if singles:
+                    for r, c in unit:
+                        if symbols[r][c] == "*":
+                            allowed = self._allowed(r, c) & singles
+                            if allowed:
+                                self._place(r, c, allowed & -allowed)
+                                progress = True
+
+
+# Rows, columns and subsquares of each size of grid, by n.
+_unit_lists = {}
+
+
+def _units(n):
+    """
+    Return the positions of every row, column and subsquare of an nxn
+    sudoku grid.
+
+    @type n: int
+    @rtype: list[list[(int, int)]]
+
+    >>> [len(_units(4)), _units(4)[-1]]
+    [12, [(2, 2), (2, 3), (3, 2), (3, 3)]]
+    """
+    if n not in _unit_lists:
+        ss = round(n ** (1 / 2))
+        units = [[(r, c) for c in range(n)] for r in range(n)]
+        units += [[(r, c) for r in range(n)] for c in range(n)]
+        units += [[(ul_row + i, ul_col + j) for i in range(ss)
+                   for j in range(ss)]
+                  for ul_row in range(0, n, ss) for ul_col in range(0, n, ss)]
+        _unit_lists[n] = units
+    return _unit_lists[n]
+
+
 if __name__ == "__main__":
     import doctest
 
@@ -364,3 +704,11 @@ if __name__ == "__main__":
     print("time to solve 9x9 using depth_first: {} seconds\n".format(
         end - start))
     print(sol)
+
+    start = time()
+    sol = depth_first_solve(ConstraintSudokuPuzzle(9, s._symbols,
+                                                   s._symbol_set))
+    end = time()
+    print("time to solve the same 9x9 with constraint propagation: "
+          "{} seconds\n".format(end - start))
+    print(sol.puzzle)
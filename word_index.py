@@ -0,0 +1,480 @@
+"""
+A read-only word list indexed for fast word-ladder steps.
+"""
+from array import array
+from collections import OrderedDict
+import hashlib
+import mmap
+import os
+import pickle
+
+# Characters a word-ladder step may write.
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+# First line of a word list compiled by compile_words.
+_WORDS_MAGIC = b"WORDS01\n"
+# Word lists loaded by load_words in this process, by real path.
+_loaded = {}
+
+
+def load_words(path):
+    """
+    Return a WordIndex of the word list at path, loading it only the
+    first time it is asked for in this process.
+
+    The file is either text, one or more words per line, or a word list
+    compiled by compile_words, which is mapped into memory instead of
+    read.  Puzzles sharing the returned WordIndex can compare their
+    dictionaries by identity, and it pickles as its path, so worker
+    processes load their own copy rather than being sent one.
+
+    @type path: str
+    @rtype: WordIndex
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "words")
+    >>> with open(path, "w") as f:
+    ...     _ = f.write("cat\\ncot\\ndog\\n")
+    >>> load_words(path) is load_words(path)
+    True
+    >>> sorted(load_words(path))
+    ['cat', 'cot', 'dog']
+    """
+    key = os.path.realpath(path)
+    if key not in _loaded:
+        with open(key, "rb") as f:
+            if f.read(len(_WORDS_MAGIC)) == _WORDS_MAGIC:
+                words = _SortedWords(mmap.mmap(f.fileno(), 0,
+                                               access=mmap.ACCESS_READ))
+            else:
+                f.seek(0)
+                words = f.read().decode("utf-8").split()
+        index = WordIndex(words)
+        index._path = key
+        _loaded[key] = index
+    return _loaded[key]
+
+
+def compile_words(path, compiled_path):
+    """
+    Save the words of the text word list at path, sorted, to
+    compiled_path in the form load_words maps into memory.
+
+    Looking a word up in a compiled list is a binary search of the
+    mapped file, so loading it costs no time and processes loading it
+    share one copy.  The offsets are stored in the byte order of the
+    machine compiling the list.
+
+    @type path: str
+    @type compiled_path: str
+    @rtype: None
+
+    >>> import os, tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> with open(os.path.join(folder, "words"), "w") as f:
+    ...     _ = f.write("dog cat\\ncot\\n")
+    >>> compile_words(os.path.join(folder, "words"), \
+    os.path.join(folder, "words.bin"))
+    >>> index = load_words(os.path.join(folder, "words.bin"))
+    >>> list(index), len(index), "cot" in index, "cog" in index
+    (['cat', 'cot', 'dog'], 3, True, False)
+    """
+    with open(path, "rb") as f:
+        words = sorted(set(f.read().decode("utf-8").split()))
+    encoded = [word.encode("utf-8") for word in words]
+    # Offsets are counted from the start of the file, so that the word
+    # list starts right after them.
+    offsets = array("I", [0]) * (len(encoded) + 1)
+    assert offsets.itemsize == 4
+    offsets[0] = len(_WORDS_MAGIC) + 4 * (len(encoded) + 2)
+    for i in range(len(encoded)):
+        offsets[i + 1] = offsets[i] + len(encoded[i])
+    with open(compiled_path, "wb") as f:
+        f.write(_WORDS_MAGIC)
+        f.write(array("I", [len(encoded)]).tobytes())
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded))
+
+
+class WordIndex:
+    """
+    A set of words, indexed by wildcard pattern.
+
+    The pattern of a word at position i is the word with its i-th
+    character replaced by "*", so "cat" has patterns "*at", "c*t" and
+    "ca*".  Words sharing a pattern are one character change apart, so
+    the neighbours of a word are found with one dictionary lookup per
+    position instead of one set lookup per position per letter.
+    """
+
+    # Indexes built by WordIndex.of, by id of the words they were built
+    # from; kept with the words so that the ids stay valid.
+    _shared = OrderedDict()
+    _shared_size = 8
+
+    def __init__(self, words):
+        """
+        Create a new WordIndex self of words.
+
+        @type self: WordIndex
+        @type words: iterable[str]
+        @rtype: None
+        """
+        if isinstance(words, _SortedWords):
+            self._words = words
+        else:
+            self._words = frozenset(words)
+        # pattern -> sorted tuple of words, built one word length at a time
+        self._buckets, self._lengths = {}, set()
+        # (length, chars) -> adjacency graph of the words of that length
+        self._graphs = {}
+        # (length, chars) -> component label of each word of that length
+        self._components = {}
+        # file this index was loaded from by load_words, if any
+        self._path = None
+        # hex digest of the words, made by __repr__ if needed
+        self._fingerprint = None
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickle WordIndex self as its path if it was loaded by load_words,
+        and in full otherwise.
+
+        @type self: WordIndex
+        @type protocol: int
+        @rtype: tuple
+        """
+        if self._path is not None:
+            return load_words, (self._path,)
+        return super().__reduce_ex__(protocol)
+
+    @classmethod
+    def of(cls, words):
+        """
+        Return a WordIndex of words, shared by every caller passing the
+        same words object.
+
+        words should not be changed once it has been indexed.
+
+        @type words: WordIndex | iterable[str]
+        @rtype: WordIndex
+
+        >>> ws = {"cat", "bat"}
+        >>> WordIndex.of(ws) is WordIndex.of(ws)
+        True
+        """
+        if isinstance(words, WordIndex):
+            return words
+        if id(words) in cls._shared:
+            cls._shared.move_to_end(id(words))
+            return cls._shared[id(words)][1]
+        index = WordIndex(words)
+        cls._shared[id(words)] = (words, index)
+        if len(cls._shared) > cls._shared_size:
+            cls._shared.popitem(last=False)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        """
+        Return the WordIndex saved by WordIndex.save at path.
+
+        @type path: str
+        @rtype: WordIndex
+        """
+        with open(path, "rb") as f:
+            words, graphs = pickle.load(f)
+        index = WordIndex(words)
+        index._graphs = graphs
+        return index
+
+    def save(self, path):
+        """
+        Save WordIndex self, with the adjacency graphs it has computed,
+        to the file at path.
+
+        @type self: WordIndex
+        @type path: str
+        @rtype: None
+        """
+        with open(path, "wb") as f:
+            pickle.dump((sorted(self._words), self._graphs), f,
+                        pickle.HIGHEST_PROTOCOL)
+
+    def __repr__(self):
+        """
+        Return a representation of WordIndex self with the number of its
+        words and a fingerprint of them, the same for every WordIndex of
+        the same words.
+
+        @type self: WordIndex
+        @rtype: str
+
+        >>> WordIndex(["cat", "dog"])
+        WordIndex(2 words, sha1 29f90a9bacc31a509782ad2550e32128eed09be7)
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for word in sorted(self._words):
+                digest.update(word.encode("utf-8") + b"\n")
+            self._fingerprint = digest.hexdigest()
+        return "WordIndex({} words, sha1 {})".format(len(self._words),
+                                                    self._fingerprint)
+
+    def __contains__(self, word):
+        """
+        Return whether word is in WordIndex self.
+
+        @type self: WordIndex
+        @type word: str
+        @rtype: bool
+        """
+        return word in self._words
+
+    def __iter__(self):
+        """
+        Return an iterator over the words of WordIndex self.
+
+        @type self: WordIndex
+        @rtype: iterator[str]
+        """
+        return iter(self._words)
+
+    def __len__(self):
+        """
+        Return the number of words in WordIndex self.
+
+        @type self: WordIndex
+        @rtype: int
+        """
+        return len(self._words)
+
+    def neighbours(self, word, chars=LETTERS):
+        """
+        Return the words of WordIndex self that word becomes when one of
+        its characters is replaced by a character in chars, in order of
+        the position changed and then alphabetically.  word itself is
+        included if it is in self and has a character in chars.
+
+        @type self: WordIndex
+        @type word: str
+        @type chars: str
+        @rtype: list[str]
+
+        >>> index = WordIndex(["cat", "bat", "cot", "Cat", "dog"])
+        >>> index.neighbours("cat")
+        ['bat', 'cat', 'cot']
+        >>> index.neighbours("cut")
+        ['cat', 'cot']
+        """
+        graph = self._graphs.get((len(word), chars))
+        if graph is not None and word in graph:
+            return list(graph[word])
+        self._index_length(len(word))
+        buckets = self._buckets
+        result, seen = [], set()
+        for i in range(len(word)):
+            for other in buckets.get(word[:i] + "*" + word[i + 1:], ()):
+                if other[i] in chars and other not in seen:
+                    seen.add(other)
+                    result.append(other)
+        return result
+
+    def predecessors(self, word, chars=LETTERS):
+        """
+        Return the words of WordIndex self that become word when one of
+        their characters is replaced by a character in chars: those whose
+        neighbours include word.  They are in order of the position
+        changed and then alphabetically.
+
+        A step can only write characters in chars, so this differs from
+        the neighbours of word where a character of word is not in chars.
+
+        @type self: WordIndex
+        @type word: str
+        @type chars: str
+        @rtype: list[str]
+
+        >>> index = WordIndex(["cat", "bat", "Cat", "dog"])
+        >>> index.predecessors("cat")
+        ['Cat', 'bat', 'cat']
+        >>> index.neighbours("Cat"), index.predecessors("Cat")
+        (['bat', 'cat', 'Cat'], ['Cat'])
+        """
+        self._index_length(len(word))
+        buckets = self._buckets
+        result, seen = [], set()
+        for i in range(len(word)):
+            if word[i] in chars:
+                for other in buckets.get(word[:i] + "*" + word[i + 1:], ()):
+                    if other not in seen:
+                        seen.add(other)
+                        result.append(other)
+        return result
+
+    def graph(self, length, chars=LETTERS):
+        """
+        Return the adjacency graph of the words of WordIndex self with
+        length characters: each word maps to its neighbours.
+
+        The graph is computed once and kept, and is saved with self by
+        WordIndex.save, after which neighbours are plain lookups.
+
+        @type self: WordIndex
+        @type length: int
+        @type chars: str
+        @rtype: dict[str, tuple[str]]
+
+        >>> WordIndex(["cat", "bat", "dog"]).graph(3)["bat"]
+        ('bat', 'cat')
+        """
+        if (length, chars) not in self._graphs:
+            self._graphs[(length, chars)] = {
+                word: tuple(self.neighbours(word, chars))
+                for word in self._words if len(word) == length}
+        return self._graphs[(length, chars)]
+
+    def component(self, word, chars=LETTERS):
+        """
+        Return a label of the component of word in the graph of the words
+        of WordIndex self, or None if word is not in self.
+
+        Words are in the same component when they are joined by steps
+        changing one character to one in chars, taken in either
+        direction, so a ladder from one word of self to another exists
+        only if they have the same label.  The labels of the words of a
+        length are found together, the first time one of them is asked
+        for, by a union-find pass over the words sharing each pattern.
+
+        @type self: WordIndex
+        @type word: str
+        @type chars: str
+        @rtype: int | None
+
+        >>> index = WordIndex(["cat", "cot", "cog", "dog", "ape", "apt"])
+        >>> index.component("cat") == index.component("dog")
+        True
+        >>> index.component("cat") == index.component("ape")
+        False
+        >>> index.component("cow") is None
+        True
+        """
+        if (len(word), chars) not in self._components:
+            self._components[(len(word), chars)] = self._label(len(word),
+                                                               chars)
+        return self._components[(len(word), chars)].get(word)
+
+    def _label(self, length, chars):
+        # Return the component label of each word of self with length
+        # characters, as explained in component.
+        #
+        # @type self: WordIndex
+        # @type length: int
+        # @type chars: str
+        # @rtype: dict[str, int]
+        self._index_length(length)
+        parent = {}
+
+        def find(word):
+            # Return the root of word's tree, halving the path to it.
+            while parent.get(word, word) != word:
+                parent[word] = parent.get(parent[word], parent[word])
+                word = parent[word]
+            return word
+        for pattern, words in self._buckets.items():
+            if len(pattern) != length:
+                continue
+            i = pattern.index("*")
+            # Every word of the bucket steps to each one whose i-th
+            # character is in chars; the others are joined only through
+            # those.
+            hub = next((w for w in words if w[i] in chars), None)
+            if hub is not None:
+                root = find(hub)
+                for word in words:
+                    other = find(word)
+                    if other != root:
+                        parent[other] = root
+        labels, roots = {}, {}
+        for word in self._words:
+            if len(word) == length:
+                labels[word] = roots.setdefault(find(word), len(roots))
+        return labels
+
+    def _index_length(self, length):
+        # Add the patterns of the words with length characters to
+        # self._buckets, unless that was done already.
+        #
+        # @type self: WordIndex
+        # @type length: int
+        # @rtype: None
+        if length in self._lengths:
+            return
+        buckets = {}
+        for word in self._words:
+            if len(word) == length:
+                for i in range(length):
+                    buckets.setdefault(word[:i] + "*" + word[i + 1:],
+                                       []).append(word)
+        for pattern in buckets:
+            self._buckets[pattern] = tuple(sorted(buckets[pattern]))
+        self._lengths.add(length)
+
+
+class _SortedWords:
+    """
+    The sorted words of a word list compiled by compile_words, read from
+    the file mapped into memory as they are needed.
+    """
+
+    def __init__(self, data):
+        """
+        Create a new _SortedWords self of the compiled word list data.
+
+        @type self: _SortedWords
+        @type data: mmap.mmap
+        @rtype: None
+        """
+        start = len(_WORDS_MAGIC)
+        self._data = data
+        self._count = array("I", data[start:start + 4])[0]
+        self._offsets = memoryview(data)[start + 4:start + 4 * (
+            self._count + 2)].cast("I")
+
+    def __contains__(self, word):
+        """
+        Return whether word is in _SortedWords self.
+
+        @type self: _SortedWords
+        @type word: str
+        @rtype: bool
+        """
+        target, data, offsets = word.encode("utf-8"), self._data, self._offsets
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if data[offsets[middle]:offsets[middle + 1]] < target:
+                low = middle + 1
+            else:
+                high = middle
+        return (low < self._count and
+                data[offsets[low]:offsets[low + 1]] == target)
+
+    def __iter__(self):
+        """
+        Return an iterator over the words of _SortedWords self, in order.
+
+        @type self: _SortedWords
+        @rtype: iterator[str]
+        """
+        data, offsets = self._data, self._offsets
+        return (data[offsets[i]:offsets[i + 1]].decode("utf-8")
+                for i in range(self._count))
+
+    def __len__(self):
+        """
+        Return the number of words in _SortedWords self.
+
+        @type self: _SortedWords
+        @rtype: int
+        """
+        return self._count
@@ -1,5 +1,5 @@
 from puzzle import Puzzle
-import codecs
+from word_index import WordIndex, LETTERS, load_words
 
 class WordLadderPuzzle(Puzzle):
     """
@@ -14,22 +14,41 @@ class WordLadderPuzzle(Puzzle):
 
         @type from_word: str
         @type to_word: str
-        @type ws: set[str]
+        @type ws: set[str] | WordIndex
         @rtype: None
         """
         (self._from_word, self._to_word, self._word_set) = (from_word,
                                                             to_word, ws)
         # set of characters to use for 1-character changes
-        self._chars = "abcdefghijklmnopqrstuvwxyz"
+        self._chars = LETTERS
+        # WordIndex of ws, looked up when first needed
+        self._index = None
 
     # TODO
     # implement __eq__ and __str__
     # __repr__ is up to you
+    def __repr__(self):
+        '''(self) -> str
+        Return the string representation of the puzzle. Puzzles with the same
+        words and dictionary contents have the same representation; the
+        dictionary is shown by its WordIndex, which has a fingerprint of its
+        words.
+        >>> repr(WordLadderPuzzle('cat', 'dog', {'cat', 'dog'})) == \
+        repr(WordLadderPuzzle('cat', 'dog', {'dog', 'cat'}))
+        True
+        >>> repr(WordLadderPuzzle('cat', 'dog', {'cat', 'dog'}))[:38]
+        "WordLadderPuzzle('cat', 'dog', WordInd"
+        '''
+        return 'WordLadderPuzzle({!r}, {!r}, {!r})'.format(
+            self._from_word, self._to_word, WordIndex.of(self._word_set))
+
     def __eq__(self, other):
         '''(self) -> bool
-        Returns True if the both instances are same else False.
-        >>> wlp1 = WordLadderPuzzle('Dino', 'onid', set('dino'))
-        >>> wlp2 = WordLadderPuzzle('Dino', 'onid', set('dino'))
+        Returns True if the both instances are same else False. Puzzles
+        only have the same dictionary if they share the same word set object.
+        >>> ws = set('dino')
+        >>> wlp1 = WordLadderPuzzle('Dino', 'onid', ws)
+        >>> wlp2 = WordLadderPuzzle('Dino', 'onid', ws)
         >>> wlp1 == wlp2
         True
         >>> wlp1 = WordLadderPuzzle('Dino', 'onid', set('dino'))
@@ -37,9 +56,35 @@ class WordLadderPuzzle(Puzzle):
         >>> wlp1 == wlp2
         False
         '''
-        # Check all the class attributes and class type.
-        return ((self._from_word == other._from_word) and (self._to_word == 
-                other._to_word) and (self._word_set == other._word_set))
+        # Check all the class attributes and class type. The dictionary is
+        # compared by identity: comparing its contents would cost a pass over
+        # every word.
+        return ((self._from_word == other._from_word) and (self._to_word ==
+                other._to_word) and (self._word_set is other._word_set))
+
+    def __hash__(self):
+        '''(self) -> int
+        Return the hash of the puzzle, consistent with __eq__.
+        '''
+        return hash((self._from_word, self._to_word))
+
+    def __getstate__(self):
+        '''(self) -> dict
+        Return the attributes to pickle, leaving out the word index, which is
+        looked up again when needed.
+        '''
+        state = self.__dict__.copy()
+        state['_index'] = None
+        return state
+
+    def state_key(self):
+        '''(self) -> str
+        Return the current word, which identifies this configuration among
+        the puzzles working towards the same to_word.
+        >>> WordLadderPuzzle('cat', 'bat', {'bat', 'cat'}).state_key()
+        'cat'
+        '''
+        return self._from_word
 
     def __str__(self):
         '''(self) -> str
@@ -79,24 +124,14 @@ class WordLadderPuzzle(Puzzle):
         >>> print(l[4])
         From Word: dint to_word: type
         '''
-        # Create an empty list to store the extensions.
-        extensions_lst = []
+        # Look the neighbours up in the index shared by the whole ladder.
+        if self._index is None:
+            self._index = WordIndex.of(self._word_set)
         extensions_lst_obj = []
-        # Counter var to keep track of the char index.
-        char_index = 0
-        # Loop through the self._from_word.
-        for char in self._from_word:
-            # Loop through the self._chars.
-            for alpha in self._chars:
-                # Get the new extension word
-                new_extension = self._from_word[:char_index] + alpha + self._from_word[char_index + 1:]
-                # Check if the new extension word is in the word set.
-                if (new_extension in self._word_set) and (new_extension not in extensions_lst):
-                    # Add the word to the extension list
-                    extensions_lst.append(new_extension)
-                    # Append each object to the list
-                    extensions_lst_obj.append(WordLadderPuzzle(new_extension, self._to_word, self._word_set))
-            char_index += 1
+        for word in self._index.neighbours(self._from_word, self._chars):
+            extension = WordLadderPuzzle(word, self._to_word, self._word_set)
+            extension._index = self._index
+            extensions_lst_obj.append(extension)
         # Return the list of objects.
         return extensions_lst_obj
 
@@ -116,15 +151,96 @@ class WordLadderPuzzle(Puzzle):
         # Check if the _from_word is the same as _to_word.
         return self._from_word == self._to_word
 
+    def fail_fast(self):
+        '''(self) -> bool
+        Return True if no ladder can lead from _from_word to _to_word: the
+        words differ in length, _to_word is not in the word set, or the
+        words are in different components of the word set's one-character
+        change graph, as labelled by WordIndex.component.
+        >>> ws = {'cat', 'cot', 'cog', 'dog', 'ape', 'apt'}
+        >>> WordLadderPuzzle('cat', 'dog', ws).fail_fast()
+        False
+        >>> WordLadderPuzzle('cut', 'dog', ws).fail_fast()
+        False
+        >>> WordLadderPuzzle('cat', 'ape', ws).fail_fast()
+        True
+        >>> WordLadderPuzzle('cat', 'cow', ws).fail_fast()
+        True
+        >>> WordLadderPuzzle('cat', 'cots', ws).fail_fast()
+        True
+        '''
+        if self._from_word == self._to_word:
+            return False
+        if len(self._from_word) != len(self._to_word):
+            return True
+        if self._index is None:
+            self._index = WordIndex.of(self._word_set)
+        target = self._index.component(self._to_word, self._chars)
+        if target is None:
+            # Only words in the word set are ever stepped to.
+            return True
+        if self._from_word in self._index:
+            return self._index.component(self._from_word,
+                                         self._chars) != target
+        # _from_word is outside the word set; its first step decides.
+        return all(self._index.component(word, self._chars) != target
+                   for word in self._index.neighbours(self._from_word,
+                                                      self._chars))
+
+    def reversed_puzzle(self):
+        '''(self) -> WordLadderPuzzle or None
+        Return the puzzle stepping from _to_word back to _from_word, or None
+        if _to_word has a character outside self._chars or _from_word is not
+        in the word set. A step can only write characters from self._chars,
+        so it can be undone whenever the character it overwrote is one of
+        them too; every word reachable from such a _to_word consists of those
+        characters only. Steps only ever lead to words in the word set, so
+        the reversed puzzle could never reach a _from_word outside it.
+        >>> ws = {'cat', 'cot', 'cog', 'dog'}
+        >>> print(WordLadderPuzzle('cat', 'dog', ws).reversed_puzzle())
+        From Word: dog to_word: cat
+        >>> print(WordLadderPuzzle('cat', "Dog", ws).reversed_puzzle())
+        None
+        >>> print(WordLadderPuzzle('cut', 'dog', ws).reversed_puzzle())
+        None
+        '''
+        if self._index is None:
+            self._index = WordIndex.of(self._word_set)
+        if (self._from_word in self._index and
+                all(char in self._chars for char in self._to_word)):
+            return WordLadderPuzzle(self._to_word, self._from_word,
+                                    self._word_set)
+        return None
+
+    def heuristic(self):
+        '''(self) -> int or float
+        Return the number of positions where _from_word differs from
+        _to_word, a lower bound on the steps left since each step changes one
+        character. Return inf when no ladder can exist: the words differ in
+        length, or _to_word needs a character that is not in self._chars.
+        >>> WordLadderPuzzle('same', 'cost', set()).heuristic()
+        4
+        >>> WordLadderPuzzle('same', 'costs', set()).heuristic()
+        inf
+        '''
+        if len(self._from_word) != len(self._to_word):
+            return float('inf')
+        distance = 0
+        for i in range(len(self._to_word)):
+            if self._from_word[i] != self._to_word[i]:
+                if self._to_word[i] not in self._chars:
+                    # Only the characters in self._chars are ever written.
+                    return float('inf')
+                distance += 1
+        return distance
+
 
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
     from puzzle_tools import breadth_first_solve, depth_first_solve
     from time import time
-    with codecs.open("words", "r", 'utf-8') as words:
-        word_set = set(words.read().split())
-    w = WordLadderPuzzle("same", "cost", word_set)
+    w = WordLadderPuzzle("same", "cost", load_words("words"))
 
     start = time()
     sol = breadth_first_solve(w)
@@ -138,3 +254,9 @@ if __name__ == '__main__':
     print("Solving word ladder from same->cost")
     print("...using depth-first-search")
     print("Solutions: {} took {} seconds.".format(sol, end - start))
+    start = time()
+    sol = breadth_first_solve(WordLadderPuzzle("same", "liar", load_words("words")))
+    end = time()
+    print("Solving word ladder from same->liar, which no ladder joins")
+    print("...using breadth-first-search")
+    print("Solutions: {} took {} seconds.".format(sol, end - start))
@@ -0,0 +1,210 @@
+"""
+Distance tables for answering many word ladders to the same word.
+
+A DistanceTable is made by one breadth-first search backwards from a
+target word, over the predecessors of each word, and records for every
+word that can reach the target how many steps it is away and which word
+it steps to next.  A ladder to the target is then read off the table in
+time proportional to its length.  Tables are kept in a cache of the
+most recently used targets, so a workload of queries sharing targets
+pays for one search per target.
+"""
+from collections import OrderedDict
+from puzzle_tools import PuzzleNode
+from word_index import WordIndex, LETTERS
+from word_ladder_puzzle import WordLadderPuzzle
+
+# Tables made by distance_table, by id of their WordIndex, target and
+# chars; kept with the WordIndex so that the ids stay valid.
+_tables = OrderedDict()
+# Most tables kept in _tables.
+TABLES_SIZE = 16
+
+
+class DistanceTable:
+    """
+    The distance to target, and the next word on a shortest ladder to
+    target, of every word of a WordIndex that can reach target.
+    """
+
+    def __init__(self, index, target, chars=LETTERS):
+        """
+        Create a new DistanceTable self of the words of index that can be
+        changed into target, writing only characters in chars.
+
+        @type self: DistanceTable
+        @type index: WordIndex
+        @type target: str
+        @type chars: str
+        @rtype: None
+
+        >>> table = DistanceTable(WordIndex(["cat", "cot", "cog", "dog"]), \
+        "dog")
+        >>> len(table), table.distance("cat"), table.distance("bat")
+        (4, 3, None)
+        >>> len(DistanceTable(WordIndex(["cat", "cot"]), "cow"))
+        1
+        """
+        self.target = target
+        # word -> steps to target, and word -> next word towards target
+        self._distance, self._next = {target: 0}, {}
+        # Only words of index are ever stepped to.
+        layer = [target] if target in index else []
+        while len(layer) != 0:
+            next_layer = []
+            for word in layer:
+                steps = self._distance[word] + 1
+                for other in index.predecessors(word, chars):
+                    if other not in self._distance:
+                        self._distance[other] = steps
+                        self._next[other] = word
+                        next_layer.append(other)
+            layer = next_layer
+
+    def __len__(self):
+        """
+        Return the number of words in DistanceTable self, target among
+        them.
+
+        @type self: DistanceTable
+        @rtype: int
+        """
+        return len(self._distance)
+
+    def distance(self, word):
+        """
+        Return the number of steps from word to the target of
+        DistanceTable self, or None if word cannot reach it.
+
+        @type self: DistanceTable
+        @type word: str
+        @rtype: int | None
+        """
+        return self._distance.get(word)
+
+    def ladder(self, word):
+        """
+        Return the words of a shortest ladder from word to the target of
+        DistanceTable self, both included, or None if there is none.
+
+        @type self: DistanceTable
+        @type word: str
+        @rtype: list[str] | None
+
+        >>> table = DistanceTable(WordIndex(["cat", "cot", "cog", "dog"]), \
+        "dog")
+        >>> table.ladder("cat")
+        ['cat', 'cot', 'cog', 'dog']
+        >>> table.ladder("bat") is None
+        True
+        """
+        if word not in self._distance:
+            return None
+        ladder = [word]
+        while ladder[-1] != self.target:
+            ladder.append(self._next[ladder[-1]])
+        return ladder
+
+
+def distance_table(words, target, chars=LETTERS):
+    """
+    Return the DistanceTable of words to target, from the cache if it was
+    asked for recently.
+
+    At most TABLES_SIZE tables are kept, the least recently used being
+    dropped first.  words should not be changed once it has been
+    indexed.
+
+    @type words: WordIndex | iterable[str]
+    @type target: str
+    @type chars: str
+    @rtype: DistanceTable
+
+    >>> ws = {"cat", "cot", "cog", "dog"}
+    >>> distance_table(ws, "dog") is distance_table(ws, "dog")
+    True
+    """
+    index = WordIndex.of(words)
+    key = (id(index), target, chars)
+    if key in _tables:
+        _tables.move_to_end(key)
+        return _tables[key][1]
+    table = DistanceTable(index, target, chars)
+    _tables[key] = (index, table)
+    if len(_tables) > TABLES_SIZE:
+        _tables.popitem(last=False)
+    return table
+
+
+def table_solve(puzzle):
+    """
+    Return a path from PuzzleNode(puzzle) to a PuzzleNode containing
+    a solution, with each child PuzzleNode containing an extension
+    of the puzzle in its parent.  Return None if this is not possible.
+
+    The path is a shortest one, read off the distance table of the
+    puzzle's to_word, which is made by distance_table.
+
+    @type puzzle: WordLadderPuzzle
+    @rtype: PuzzleNode | None
+
+    >>> ws = {"cat", "cot", "cog", "dog"}
+    >>> sol = table_solve(WordLadderPuzzle("cat", "dog", ws))
+    >>> print(sol.parent.parent.parent.puzzle)
+    From Word: cat to_word: dog
+    >>> print(table_solve(WordLadderPuzzle("cut", "dog", ws)).parent.puzzle)
+    From Word: cog to_word: dog
+    >>> table_solve(WordLadderPuzzle("cat", "cow", ws)) is None
+    True
+    """
+    node = PuzzleNode(puzzle, lazy=True)
+    if puzzle.is_solved():
+        return node
+    if puzzle.fail_fast():
+        return None
+    table = distance_table(puzzle._word_set, puzzle._to_word, puzzle._chars)
+    ladder = table.ladder(puzzle._from_word)
+    if ladder is None:
+        # from_word may be missing from the words; step to its nearest
+        # neighbour first.
+        best = None
+        for ext in puzzle.extensions():
+            steps = table.distance(ext._from_word)
+            if steps is not None and (best is None or
+                                      steps < table.distance(best)):
+                best = ext._from_word
+        if best is None:
+            return None
+        ladder = [puzzle._from_word] + table.ladder(best)
+    index = WordIndex.of(puzzle._word_set)
+    for word in ladder[1:]:
+        ext = WordLadderPuzzle(word, puzzle._to_word, puzzle._word_set)
+        ext._chars, ext._index = puzzle._chars, index
+        node = PuzzleNode(ext, parent=node, lazy=True)
+    return node
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
+    from time import time
+    from word_index import load_words
+    from puzzle_tools import breadth_first_solve
+
+    words = load_words("words")
+    starts = ["same", "cold", "lead", "head", "warm", "milk", "pale",
+              "bake", "dome", "wine"]
+    for strategy in (breadth_first_solve, table_solve):
+        start = time()
+        lengths = []
+        for word in starts:
+            solution = strategy(WordLadderPuzzle(word, "cost", words))
+            lengths.append(None)
+            if solution is not None:
+                lengths[-1] = 0
+                while solution.parent is not None:
+                    lengths[-1] += 1
+                    solution = solution.parent
+        print("{}: {} ladders to cost, of lengths {}, in {} seconds".format(
+            strategy.__name__, len(starts), lengths, time() - start))